@@ -3,20 +3,24 @@ This module is an implementation of the A* search algorithm.
 """
 
 import heapq
+import math
 
 import numpy as np
 
 from .environment_data import EnvironmentData
 from .lattice import CubicLattice
 from .utils import (
+    edges_to_csr,
     euclidean_distance,
     find_nearest,
     global_to_local,
+    reconstruct_path,
     valid_neighbors,
 )
+from .utils_numba import NUMBA_AVAILABLE, _astar_core
 
 
-def astar(free_space_lattice_object, start_gps, goal_gps, h):
+def astar(free_space_lattice_object, start_gps, goal_gps, h, bidirectional=False):
     """
     Perform A* search in the free space lattice to find a path from the start position to the goal position.
 
@@ -25,6 +29,7 @@ def astar(free_space_lattice_object, start_gps, goal_gps, h):
            start_gps (numpy.ndarray): a numpy array of shape (3,) containing the start GPS position
            goal_gps (numpy.ndarray): a numpy array of shape (3,) containing the goal GPS position
            h (function): the heuristic function to use for A* search
+           bidirectional (bool): whether to search from the start and the goal position at the same time
 
     Returns:
             list: a list of indices representing the path from the start position to the goal position
@@ -33,57 +38,209 @@ def astar(free_space_lattice_object, start_gps, goal_gps, h):
             The A* search algorithm uses a priority queue to explore the lattice space. The algorithm continues to explore the lattice space until the goal position is found or all points have been visited.
            The benefits of this approach for pathfinding are that it is guaranteed to find the shortest path and is complete if the heuristic is admissible.
            On the other hand, the A* search algorithm can be slow and memory-intensive for large lattices due to the way it explores the lattice space.
+           When `h` is `euclidean_distance`, the heuristic is computed inline, and, if Numba is installed, the search runs in a compiled kernel.
     """
     start_pos = global_to_local(start_gps, free_space_lattice_object.gps_home)
     start_index = find_nearest(free_space_lattice_object, start_pos)
     goal_pos = global_to_local(goal_gps, free_space_lattice_object.gps_home)
     goal_index = find_nearest(free_space_lattice_object, goal_pos)
 
-    goal_found = False
-    branch = {}
-    branch[start_index] = [None, 0.0]
-    visited = set()
+    if bidirectional:
+        return _bidirectional_astar(
+            free_space_lattice_object, start_index, goal_index, h
+        )
+
+    if NUMBA_AVAILABLE and h is euclidean_distance:
+        # The compiled search inlines the Euclidean heuristic, so it can only stand in for that heuristic
+        parent, goal_found = _astar_core(
+            free_space_lattice_object.indptr,
+            free_space_lattice_object.indices,
+            free_space_lattice_object.weights,
+            np.asarray(free_space_lattice_object.free_space_points),
+            start_index,
+            goal_index,
+        )
+        path = []
+        if goal_found:
+            print("Goal found")
+            path = reconstruct_path(parent, start_index, goal_index)
+        return path
+
+    # Lattice indices are dense, so the search state is kept in flat arrays indexed by point instead of dictionaries
+    number_of_points = len(free_space_lattice_object.free_space_points)
+    parent = np.full(number_of_points, -1, dtype=np.int32)
+    g_scores = np.full(number_of_points, np.inf)
+    closed = np.zeros(number_of_points, dtype=bool)
+    g_scores[start_index] = 0.0
 
+    # The Euclidean heuristic is computed inline on scalars against the cached goal coordinates
+    free_space_points = free_space_lattice_object.free_space_points
+    inline_heuristic = h is euclidean_distance
+    gx, gy, gz = np.asarray(free_space_points[goal_index], dtype=float).tolist()
+
+    goal_found = False
     priority_queue = []
-    heapq.heappush(priority_queue, (0.0, start_index))
+    heapq.heappush(priority_queue, (0.0, -0.0, start_index))
 
+    # Ties on the f-score are broken in favor of the larger g-score, which is closer to the goal,
+    # so plateaus of equal f-score are crossed with fewer expansions
     while priority_queue:
-        _, current_index = heapq.heappop(priority_queue)
-        if current_index in visited:
+        _, _, current_index = heapq.heappop(priority_queue)
+        if closed[current_index]:
             continue
-        visited.add(current_index)
+        closed[current_index] = True
         if current_index == goal_index:
             print("Goal found")
             goal_found = True
             break
-        for neighbor_index, distance in valid_neighbors(
+        g_score = g_scores[current_index]
+        neighbor_indices, distances = valid_neighbors(
             free_space_lattice_object, current_index
+        )
+        for neighbor_index, distance in zip(
+            neighbor_indices.tolist(), distances.tolist()
         ):
-            if neighbor_index in visited:
+            if closed[neighbor_index]:
                 continue
-            g_score = branch[current_index][1]
             g_score_tentative = g_score + distance
-            h_score_tentative = h(
-                free_space_lattice_object, neighbor_index, goal_index
-            )
-            f_score_tentative = g_score_tentative + h_score_tentative
-            if neighbor_index not in branch.keys() or (
-                (neighbor_index in branch.keys())
-                and g_score_tentative <= branch[neighbor_index][1]
-            ):
+            if g_score_tentative <= g_scores[neighbor_index]:
+                if inline_heuristic:
+                    nx, ny, nz = free_space_points[neighbor_index].tolist()
+                    h_score_tentative = math.sqrt(
+                        (nx - gx) ** 2 + (ny - gy) ** 2 + (nz - gz) ** 2
+                    )
+                else:
+                    h_score_tentative = h(
+                        free_space_lattice_object, neighbor_index, goal_index
+                    )
+                f_score_tentative = g_score_tentative + h_score_tentative
                 heapq.heappush(
-                    priority_queue, (f_score_tentative, neighbor_index)
+                    priority_queue,
+                    (f_score_tentative, -g_score_tentative, neighbor_index),
                 )
-                branch[neighbor_index] = [current_index, g_score_tentative]
+                parent[neighbor_index] = current_index
+                g_scores[neighbor_index] = g_score_tentative
 
+    path = []
     if goal_found:
-        cost = branch[goal_index][1]
-        path = []
-        while current_index != start_index:
-            path.append(current_index)
-            current_index = branch[current_index][0]
-        path.append(start_index)
-        path = path[::-1]
+        path = reconstruct_path(parent, start_index, goal_index)
 
     return path
 
+
+def _bidirectional_astar(free_space_lattice_object, start_index, goal_index, h):
+    """
+    Perform A* search from the start and the goal index at the same time until the two searches meet.
+
+    Args:
+            free_space_lattice_object (Lattice object): an object of the CubicLattice class
+           start_index (int): the index of the start point in the free space lattice
+           goal_index (int): the index of the goal point in the free space lattice
+           h (function): the heuristic function to use for A* search
+
+    Returns:
+            list: a list of indices representing the path from the start position to the goal position
+
+    Note:
+            The forward search runs on the graph and estimates the distance to the goal; the backward search runs on the
+            reversed graph and estimates the distance to the start. The searches expand a point in turn, and every edge
+            relaxation that reaches a point already reached by the other search is a candidate meeting point, whose path cost is
+            the sum of both g-scores. The best candidate is optimal once the smallest f-score of either open list is no smaller
+            than its cost, since every cheaper path would have to pass through a point of both open lists.
+    """
+    free_space_points = free_space_lattice_object.free_space_points
+    number_of_points = len(free_space_points)
+    inline_heuristic = h is euclidean_distance
+
+    # The backward search follows the edges in reverse, which matters for directed graphs such as a PRM's
+    indptr = free_space_lattice_object.indptr
+    indices = free_space_lattice_object.indices
+    weights = free_space_lattice_object.weights
+    sources = np.repeat(np.arange(number_of_points), np.diff(indptr))
+    reverse_indptr, reverse_indices, reverse_weights = edges_to_csr(
+        number_of_points, indices, sources, weights
+    )
+
+    def heuristic(index, target_index, target_xyz):
+        if inline_heuristic:
+            x, y, z = free_space_points[index].tolist()
+            tx, ty, tz = target_xyz
+            return math.sqrt((x - tx) ** 2 + (y - ty) ** 2 + (z - tz) ** 2)
+        return h(free_space_lattice_object, index, target_index)
+
+    searches = []
+    for origin_index, target_index, graph in (
+        (start_index, goal_index, (indptr, indices, weights)),
+        (goal_index, start_index, (reverse_indptr, reverse_indices, reverse_weights)),
+    ):
+        target_xyz = np.asarray(free_space_points[target_index], dtype=float).tolist()
+        g_scores = np.full(number_of_points, np.inf)
+        g_scores[origin_index] = 0.0
+        searches.append(
+            {
+                "target_index": target_index,
+                "target_xyz": target_xyz,
+                "graph": graph,
+                "g_scores": g_scores,
+                "parent": np.full(number_of_points, -1, dtype=np.int32),
+                "closed": np.zeros(number_of_points, dtype=bool),
+                "priority_queue": [
+                    (
+                        heuristic(origin_index, target_index, target_xyz),
+                        -0.0,
+                        origin_index,
+                    )
+                ],
+            }
+        )
+    forward, backward = searches
+
+    best_cost = 0.0 if start_index == goal_index else np.inf
+    meeting_index = start_index if start_index == goal_index else -1
+    turn = 0
+    while forward["priority_queue"] and backward["priority_queue"]:
+        if (
+            max(forward["priority_queue"][0][0], backward["priority_queue"][0][0])
+            >= best_cost
+        ):
+            break
+
+        search, other = (forward, backward) if turn == 0 else (backward, forward)
+        turn = 1 - turn
+
+        _, _, current_index = heapq.heappop(search["priority_queue"])
+        if search["closed"][current_index]:
+            continue
+        search["closed"][current_index] = True
+
+        graph_indptr, graph_indices, graph_weights = search["graph"]
+        start, end = graph_indptr[current_index], graph_indptr[current_index + 1]
+        g_score = search["g_scores"][current_index]
+        for neighbor_index, distance in zip(
+            graph_indices[start:end].tolist(), graph_weights[start:end].tolist()
+        ):
+            if search["closed"][neighbor_index]:
+                continue
+            g_score_tentative = g_score + distance
+            if g_score_tentative < search["g_scores"][neighbor_index]:
+                search["g_scores"][neighbor_index] = g_score_tentative
+                search["parent"][neighbor_index] = current_index
+                f_score_tentative = g_score_tentative + heuristic(
+                    neighbor_index, search["target_index"], search["target_xyz"]
+                )
+                heapq.heappush(
+                    search["priority_queue"],
+                    (f_score_tentative, -g_score_tentative, neighbor_index),
+                )
+                path_cost = g_score_tentative + other["g_scores"][neighbor_index]
+                if path_cost < best_cost:
+                    best_cost = path_cost
+                    meeting_index = neighbor_index
+
+    path = []
+    if meeting_index != -1:
+        print("Goal found")
+        path = reconstruct_path(forward["parent"], start_index, meeting_index)
+        path += reconstruct_path(backward["parent"], goal_index, meeting_index)[-2::-1]
+
+    return path
@@ -7,6 +7,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 from scipy.spatial import KDTree
 
+from .utils_numba import build_collision_kernel
+
 
 class EnvironmentData:
     """
@@ -57,19 +59,19 @@ class EnvironmentData:
 
         # Setting margin of safety and calculating centers, half-sizes, and heights
         self._margin_of_safety = margin_of_safety
-        self._centers = obstacle_geometry_as_array[:, :3]
-        self._halfsizes = (
+        self._centers = np.ascontiguousarray(obstacle_geometry_as_array[:, :3])
+        self._halfsizes = np.ascontiguousarray(
             obstacle_geometry_as_array[:, 3:] + self._margin_of_safety
         )
         self._heights = self._centers[:, 2] + self._halfsizes[:, 2]
 
+        # Precomputing the lower and upper corners of the obstacles, so collision checks compare against them directly
+        self._lower_corners = self._centers - self._halfsizes
+        self._upper_corners = self._centers + self._halfsizes
+
         # Calculating bounds and lengths
-        xmin = np.min(self._centers[:, 0] - self._halfsizes[:, 0])
-        xmax = np.max(self._centers[:, 0] + self._halfsizes[:, 0])
-        ymin = np.min(self._centers[:, 1] - self._halfsizes[:, 1])
-        ymax = np.max(self._centers[:, 1] + self._halfsizes[:, 1])
-        zmin = np.min(self._centers[:, 2] - self._halfsizes[:, 2])
-        zmax = np.max(self._centers[:, 2] + self._halfsizes[:, 2])
+        xmin, ymin, zmin = np.min(self._lower_corners, axis=0)
+        xmax, ymax, zmax = np.max(self._upper_corners, axis=0)
         self._xbounds = np.array([xmin, xmax])
         self._ybounds = np.array([ymin, ymax])
         self._zbounds = np.array([zmin, zmax])
@@ -78,6 +80,9 @@ class EnvironmentData:
         # Incorporating spatial data structure for fast nearest neighbor obstacle lookups
         self._ground_centers = KDTree(self._centers[:, :2])
 
+        # The collision kernel specialized on the obstacles is built on first use, see `collision_kernel`
+        self._collision_kernel = None
+
     # Property methods to access private attributes
     @property
     def home_latitude(self):
@@ -129,6 +134,20 @@ class EnvironmentData:
         """
         return self._heights
 
+    @property
+    def lower_corners(self):
+        """
+        The lower corners (centers minus half-sizes) of the obstacles in the environment. Type: numpy.ndarray.
+        """
+        return self._lower_corners
+
+    @property
+    def upper_corners(self):
+        """
+        The upper corners (centers plus half-sizes) of the obstacles in the environment. Type: numpy.ndarray.
+        """
+        return self._upper_corners
+
     @property
     def xbounds(self):
         """
@@ -165,6 +184,21 @@ class EnvironmentData:
         """
         return self._ground_centers
 
+    @property
+    def collision_kernel(self):
+        """
+        A point collision check specialized on the obstacles of the environment, built on first access. Type: function.
+
+        Note:
+            With Numba, the kernel is compiled on its first call in every process, so it is an opt-in for callers that run
+            many checks against this environment; see `utils_numba.build_collision_kernel`.
+        """
+        if self._collision_kernel is None:
+            self._collision_kernel = build_collision_kernel(
+                self._lower_corners, self._upper_corners
+            )
+        return self._collision_kernel
+
     def summary(self):
         """
         Method to print a summary of the environment data.
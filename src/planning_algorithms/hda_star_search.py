@@ -0,0 +1,255 @@
+"""
+This module is an implementation of Hash Distributed A* (HDA*), a parallel variant of the A* search algorithm.
+"""
+
+import heapq
+import math
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .utils import find_nearest, global_to_local, reconstruct_path
+
+# Slots of the shared search state
+_INCUMBENT = 0  # Cost of the best path to the goal found so far
+_IN_FLIGHT = 1  # Number of messages sent but not yet processed by their owner
+_BUSY = 2  # Number of workers holding or processing open states
+
+
+def _share(array, blocks):
+    """
+    Copy an array into a new shared memory block.
+
+    Args:
+            array (numpy.ndarray): the array to copy
+            blocks (list): a list to which the new shared memory block is appended, so it can be released later
+
+    Returns:
+            tuple: the name, shape, and data type needed to attach to the block from another process
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    blocks.append(block)
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block.name, array.shape, array.dtype.str
+
+
+def _attach(descriptor, blocks):
+    """
+    Attach to a shared memory block created by `_share`.
+
+    Args:
+            descriptor (tuple): the name, shape, and data type returned by `_share`
+            blocks (list): a list to which the attached block is appended, so it can be closed later
+
+    Returns:
+            numpy.ndarray: an array backed by the shared memory block
+    """
+    name, shape, dtype = descriptor
+    block = shared_memory.SharedMemory(name=name)
+    blocks.append(block)
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _hda_star_worker(
+    worker_id, descriptors, goal_index, inboxes, lock, state, done
+):
+    """
+    Expand the states owned by one worker of an HDA* search until the search is done.
+
+    Args:
+            worker_id (int): the index of this worker
+            descriptors (dict): the shared memory descriptors of the graph arrays and of the search state arrays
+            goal_index (int): the index of the goal point
+            inboxes (list): the message queue of every worker
+            lock (multiprocessing.Lock): the lock guarding the shared search state
+            state (multiprocessing.RawArray): the shared search state, see `_INCUMBENT`, `_IN_FLIGHT`, and `_BUSY`
+            done (multiprocessing.Event): set by the coordinator once the search has terminated
+
+    Note:
+            Each point is owned by exactly one worker, so a worker only writes the g-scores and parents of the points it owns.
+            Generated states owned by other workers are sent to their owner as lists of (g, index, parent) tuples, one message
+            per owner and expansion.
+            The worker counts itself in `_BUSY` from the moment it takes a message until its open list runs dry, and a message
+            stays counted in `_IN_FLIGHT` until its state is in the open list of its owner, so the coordinator can only observe
+            both counters at zero once no work is left anywhere.
+    """
+    # The blocks stay attached until the process exits, since the arrays below are views of them
+    blocks = []
+    indptr = _attach(descriptors["indptr"], blocks)
+    indices = _attach(descriptors["indices"], blocks)
+    weights = _attach(descriptors["weights"], blocks)
+    coords = _attach(descriptors["coords"], blocks)
+    owners = _attach(descriptors["owners"], blocks)
+    g_scores = _attach(descriptors["g_scores"], blocks)
+    parent = _attach(descriptors["parent"], blocks)
+
+    gx, gy, gz = coords[goal_index].tolist()
+    inbox = inboxes[worker_id]
+    open_list = []
+    busy = False
+
+    def receive(g_score, index, parent_index):
+        if g_score < g_scores[index]:
+            g_scores[index] = g_score
+            parent[index] = parent_index
+            x, y, z = coords[index].tolist()
+            h_score = math.sqrt((x - gx) ** 2 + (y - gy) ** 2 + (z - gz) ** 2)
+            heapq.heappush(open_list, (g_score + h_score, -g_score, index))
+
+    while not done.is_set():
+        # Process incoming messages before expanding, blocking briefly only while idle
+        try:
+            message = inbox.get_nowait() if busy else inbox.get(timeout=0.005)
+        except queue.Empty:
+            message = None
+        if message is not None:
+            if not busy:
+                with lock:
+                    state[_BUSY] += 1
+                busy = True
+            for g_score, index, parent_index in message:
+                receive(g_score, index, parent_index)
+            with lock:
+                state[_IN_FLIGHT] -= 1
+            continue
+
+        # States that cannot improve on the incumbent path are pruned
+        incumbent = state[_INCUMBENT]
+        if open_list and open_list[0][0] >= incumbent:
+            open_list.clear()
+        if not open_list:
+            if busy:
+                with lock:
+                    state[_BUSY] -= 1
+                busy = False
+            continue
+
+        # Ties on the f-score are broken in favor of the larger g-score, as in `astar`
+        _, negative_g_score, current_index = heapq.heappop(open_list)
+        g_score = -negative_g_score
+        if g_score > g_scores[current_index]:
+            continue
+        if current_index == goal_index:
+            with lock:
+                if g_score < state[_INCUMBENT]:
+                    state[_INCUMBENT] = g_score
+            continue
+
+        # States generated for other workers are batched into one message per owner
+        outgoing = {}
+        for k in range(indptr[current_index], indptr[current_index + 1]):
+            neighbor_index = int(indices[k])
+            g_score_tentative = g_score + float(weights[k])
+            x, y, z = coords[neighbor_index].tolist()
+            h_score = math.sqrt((x - gx) ** 2 + (y - gy) ** 2 + (z - gz) ** 2)
+            if g_score_tentative + h_score >= incumbent:
+                continue
+            owner = owners[neighbor_index]
+            if owner == worker_id:
+                receive(g_score_tentative, neighbor_index, current_index)
+            else:
+                outgoing.setdefault(owner, []).append(
+                    (g_score_tentative, neighbor_index, current_index)
+                )
+        if outgoing:
+            with lock:
+                state[_IN_FLIGHT] += len(outgoing)
+            for owner, batch in outgoing.items():
+                inboxes[owner].put(batch)
+
+
+def hda_star(free_space_lattice_object, start_gps, goal_gps, workers=2):
+    """
+    Perform Hash Distributed A* (HDA*) search in the free space lattice with a pool of worker processes.
+
+    Args:
+            free_space_lattice_object (Lattice object): an object of the CubicLattice class
+           start_gps (numpy.ndarray): a numpy array of shape (3,) containing the start GPS position
+           goal_gps (numpy.ndarray): a numpy array of shape (3,) containing the goal GPS position
+           workers (int): the number of worker processes
+
+    Returns:
+            list: a list of indices representing the path from the start position to the goal position
+
+    Note:
+            Every point of the lattice is assigned to a worker by a random hash table, in the manner of Zobrist hashing. Each worker
+            keeps the open list of the points it owns and expands them in parallel with the other workers, sending every generated
+            state to the worker that owns it. The graph and the g-scores and parents of all points live in shared memory.
+            The search terminates once no worker holds a state that could improve on the best path found and no message is in
+            flight, so, as with `astar`, the path is optimal for the Euclidean heuristic.
+            The benefits of this approach are that expansions run on several cores at once, outside the reach of the GIL.
+            On the other hand, every message between workers is pickled and sent through a pipe, and the workers share one lock
+            for the termination counters, so the communication overhead outweighs the parallel speedup unless expansions are
+            expensive; on the lattices of this package the serial `astar` is faster.
+    """
+    start_pos = global_to_local(start_gps, free_space_lattice_object.gps_home)
+    start_index = int(find_nearest(free_space_lattice_object, start_pos))
+    goal_pos = global_to_local(goal_gps, free_space_lattice_object.gps_home)
+    goal_index = int(find_nearest(free_space_lattice_object, goal_pos))
+
+    coords = np.asarray(free_space_lattice_object.free_space_points, dtype=np.float64)
+    number_of_points = len(coords)
+    owners = np.random.default_rng(0).integers(0, workers, number_of_points)
+
+    blocks = []
+    context = multiprocessing.get_context()
+    processes = []
+    try:
+        descriptors = {
+            "indptr": _share(np.asarray(free_space_lattice_object.indptr), blocks),
+            "indices": _share(np.asarray(free_space_lattice_object.indices), blocks),
+            "weights": _share(np.asarray(free_space_lattice_object.weights), blocks),
+            "coords": _share(coords, blocks),
+            "owners": _share(owners, blocks),
+            "g_scores": _share(np.full(number_of_points, np.inf), blocks),
+            "parent": _share(np.full(number_of_points, -1, dtype=np.int64), blocks),
+        }
+        inboxes = [context.Queue() for _ in range(workers)]
+        lock = context.Lock()
+        state = context.RawArray("d", [np.inf, 1.0, 0.0])
+        done = context.Event()
+
+        # Seed the search with the start state, counted as one message in flight
+        inboxes[owners[start_index]].put([(0.0, start_index, -1)])
+
+        processes = [
+            context.Process(
+                target=_hda_star_worker,
+                args=(worker_id, descriptors, goal_index, inboxes, lock, state, done),
+                daemon=True,
+            )
+            for worker_id in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        while True:
+            with lock:
+                if state[_IN_FLIGHT] == 0 and state[_BUSY] == 0:
+                    break
+            if any(process.exitcode not in (None, 0) for process in processes):
+                raise RuntimeError("An HDA* worker process terminated unexpectedly.")
+            time.sleep(0.001)
+        done.set()
+        for process in processes:
+            process.join()
+
+        name, shape, dtype = descriptors["parent"]
+        parent_block = next(block for block in blocks if block.name == name)
+        parent = np.ndarray(shape, dtype=dtype, buffer=parent_block.buf)
+
+        path = []
+        if state[_INCUMBENT] < np.inf:
+            print("Goal found")
+            path = reconstruct_path(parent, start_index, goal_index)
+        return path
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for block in blocks:
+            block.close()
+            block.unlink()
@@ -4,13 +4,10 @@ This module implements a class for free-space graph construction.
 
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.spatial import KDTree
+from scipy.spatial import cKDTree
 
 from .environment_data import EnvironmentData
-from .utils import (
-    collision_check_spatial,
-    collision_check_vectorized,
-)
+from .utils import collision_check_batch, collision_check_segments, edges_to_csr
 
 
 class CubicLattice:
@@ -66,61 +63,83 @@ class CubicLattice:
             self._upper_bounds[2] + resolution,
             resolution,
         )
-        X, Y, Z = np.meshgrid(
-            x_positions, y_positions, z_positions, indexing="ij"
-        )
-
-        points = np.vstack([X.ravel(), Y.ravel(), Z.ravel()]).T
-
-        free_space_mask = np.ones(len(points), dtype=bool)
-
-        for idx, point in enumerate(points):
-            if collision_check_vectorized(environment_data_object, point):
-                free_space_mask[idx] = False
-
-        self._free_space_points = points[free_space_mask]
+        # Generate the grid one x-slab at a time and keep only the free points of each slab, so the full
+        # grid is never held in memory. The points keep the order of an "ij"-indexed meshgrid and are
+        # stored in float32, which is ample precision for the resolution of the lattice.
+        Y, Z = np.meshgrid(y_positions, z_positions, indexing="ij")
+        slab = np.empty((Y.size, 3), dtype=np.float32)
+        slab[:, 1] = Y.ravel()
+        slab[:, 2] = Z.ravel()
+        free_space_slabs = []
+        for x in x_positions:
+            slab[:, 0] = x
+            free_space_slabs.append(
+                slab[~collision_check_batch(environment_data_object, slab)]
+            )
 
-        self._free_space_points_kd_tree = KDTree(self._free_space_points)
+        self._free_space_points = np.ascontiguousarray(np.concatenate(free_space_slabs))
 
-        self._graph = {}
+        self._free_space_points_kd_tree = cKDTree(self._free_space_points)
 
         if connectivity == "full":
             query_radius = self._resolution * np.sqrt(2)
         elif connectivity == "partial":
             query_radius = self._resolution
 
-        for i, point_i in enumerate(self._free_space_points):
-            self._graph[i] = {}
-            neighbors = self._free_space_points_kd_tree.query_ball_point(
-                point_i, query_radius
+        # Gather every candidate edge (i, j) between neighboring free space points with a single
+        # batched query that runs in parallel over all cores
+        neighbors = self._free_space_points_kd_tree.query_ball_point(
+            self._free_space_points, query_radius, workers=-1
+        )
+        neighbor_counts = np.array([len(n) for n in neighbors], dtype=int)
+        sources = np.repeat(np.arange(len(neighbors)), neighbor_counts)
+        targets = np.fromiter(
+            (j for n in neighbors for j in n), dtype=int, count=neighbor_counts.sum()
+        )
+        # The neighbor lists are symmetric, so only the pairs with i < j are checked and each free edge is
+        # recorded in both directions below. This also avoids connecting a point to itself.
+        unique_pair = sources < targets
+        sources = sources[unique_pair]
+        targets = targets[unique_pair]
+
+        points_i = self._free_space_points[sources]
+        points_j = self._free_space_points[targets]
+        deltas = points_j - points_i
+        distances = np.linalg.norm(deltas, axis=1)
+        edge_is_free = np.ones(len(sources), dtype=bool)
+
+        # Both end points of every edge are free, so an axis-aligned edge no longer than the smallest
+        # obstacle extent along its axis cannot pass through an obstacle and needs no check
+        axis_aligned = np.count_nonzero(deltas, axis=1) == 1
+        smallest_extents = 2 * environment_data_object.halfsizes.min(axis=0)
+        needs_check = ~(axis_aligned & np.all(np.abs(deltas) <= smallest_extents, axis=1))
+        checked_edges = np.flatnonzero(needs_check)
+
+        if len(checked_edges) > 0:
+            # Every other edge is clipped exactly against the obstacle boxes, so the result does not depend on
+            # which end point the edge is seen from and an edge that only clips the corner of an obstacle is
+            # rejected. The segments are tested in chunks, so the memory used does not grow with the lattice.
+            edge_is_free[checked_edges] = ~collision_check_segments(
+                environment_data_object,
+                points_i[checked_edges],
+                points_j[checked_edges],
             )
-            for j in neighbors:
-                if i != j:  # Avoid connecting a point to itself
-                    distance = np.linalg.norm(
-                        point_i - self._free_space_points[j]
-                    )
-                    # collision check
-                    vector = self._free_space_points[j] - point_i
-                    unit_vector = (
-                        self._free_space_points[j] - point_i
-                    ) / distance
-                    spacing = 1.0
-                    num_points = int(distance / spacing)
-                    collision_test_points = np.array(
-                        [
-                            point_i + i * spacing * unit_vector
-                            for i in range(num_points + 1)
-                        ]
-                    )
-                    collision_found = False
-                    for test_point in collision_test_points:
-                        if collision_check_spatial(
-                            environment_data_object, test_point
-                        ):
-                            collision_found = True
-                            break
-                    if not collision_found:
-                        self._graph[i][j] = distance
+
+        # Store the graph in compressed sparse row (CSR) form: the neighbors of point i are
+        # indices[indptr[i]:indptr[i + 1]] and the matching edge lengths are weights[indptr[i]:indptr[i + 1]]
+        sources = sources[edge_is_free]
+        targets = targets[edge_is_free]
+        distances = distances[edge_is_free]
+        all_sources = np.concatenate([sources, targets])
+        all_targets = np.concatenate([targets, sources])
+        # Order the edges by target first, so each point's neighbors end up sorted by index
+        order = np.argsort(all_targets, kind="stable")
+        self._indptr, self._indices, self._weights = edges_to_csr(
+            len(self._free_space_points),
+            all_sources[order],
+            all_targets[order],
+            np.concatenate([distances, distances])[order],
+        )
 
     @property
     def center(self):
@@ -159,13 +178,23 @@ class CubicLattice:
 
     @property
     def free_space_points_kd_tree(self):
-        """KDTree of free space points in the lattice. Type: scipy.spatial.KDTree."""
+        """KDTree of free space points in the lattice. Type: scipy.spatial.cKDTree."""
         return self._free_space_points_kd_tree
 
     @property
-    def graph(self):
-        """A dictionary representing the graph structure of the lattice."""
-        return self._graph
+    def indptr(self):
+        """Offsets of each point's neighbors in the CSR graph of the lattice. Type: numpy.ndarray."""
+        return self._indptr
+
+    @property
+    def indices(self):
+        """Neighbor indices of the CSR graph of the lattice. Type: numpy.ndarray."""
+        return self._indices
+
+    @property
+    def weights(self):
+        """Edge lengths of the CSR graph of the lattice. Type: numpy.ndarray."""
+        return self._weights
 
     @property
     def gps_home(self):
@@ -218,18 +247,20 @@ class CubicLattice:
         )
 
         # Plotting edges (connections)
-        for point_index, connections in self._graph.items():
-            for connection_index in connections.keys():
-                point1 = self._free_space_points[point_index]
-                point2 = self._free_space_points[connection_index]
-                ax.plot(
-                    [point1[0], point2[0]],
-                    [point1[1], point2[1]],
-                    [point1[2], point2[2]],
-                    color="b",
-                    alpha=0.5,
-                    linewidth=1,
-                )
+        edge_sources = np.repeat(
+            np.arange(len(self._free_space_points)), np.diff(self._indptr)
+        )
+        for point_index, connection_index in zip(edge_sources, self._indices):
+            point1 = self._free_space_points[point_index]
+            point2 = self._free_space_points[connection_index]
+            ax.plot(
+                [point1[0], point2[0]],
+                [point1[1], point2[1]],
+                [point1[2], point2[2]],
+                color="b",
+                alpha=0.5,
+                linewidth=1,
+            )
 
         # Highlighting the path and adding arrows, if provided
         if path is not None:
@@ -1,36 +1,168 @@
-import numpy as np
 from pathlib import Path
+import argparse
+import functools
 import json
-from .environment_data import EnvironmentData
-from .lattice import CubicLattice
-from .a_star_search import astar
-from .utils import euclidean_distance
-from .prm import PRM
-from .trajectory import TrajectoryPlanner, Trajectory
+import os
+import time
+import weakref
 
+try:
+    import orjson
 
-def run_obstacle_data(obstacle_file_path, margin_of_safety):
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# The planner modules pull in numpy, scipy, and matplotlib, so each one is imported inside the `run_*` function that
+# uses it, and the interactive demo only pays for the steps that are actually run
+
+
+# Parsed configurations, keyed by resolved path, with the modification time they were parsed at
+_config_cache = {}
+
+# Configuration entries holding coordinates, which are converted to arrays once when the configuration is loaded
+_ARRAY_CONFIG_KEYS = (
+    ("astar", "start_gps"),
+    ("astar", "goal_gps"),
+    ("prm", "start_gps"),
+    ("prm", "goal_gps"),
+    ("prm", "visualization_bounds"),
+    ("lattice", "center"),
+    ("lattice", "halfsizes"),
+    ("trajectory", "waypoints"),
+)
+
+
+def _coerce_config(config_data):
+    """Converts the coordinate entries of a configuration to float64 arrays in place
+
+    Args:
+            config_data (dict): The parsed configuration
+
+    Returns:
+            dict: The same configuration, with every entry of `_ARRAY_CONFIG_KEYS` that is present stored as an array
+    """
+    import numpy as np
+
+    for section, key in _ARRAY_CONFIG_KEYS:
+        section_data = config_data.get(section)
+        if isinstance(section_data, dict) and key in section_data:
+            section_data[key] = np.ascontiguousarray(section_data[key], dtype=np.float64)
+    return config_data
+
+
+def load_config(config_path):
+    """Loads a JSON configuration file, reusing the parsed configuration while the file is unchanged
+
+    Args:
+            config_path (str): The file path of the configuration file
+
+    Returns:
+            dict: The parsed configuration
+
+    Note:
+            The file is parsed with orjson when it is installed and with the standard json module otherwise.
+            The coordinate entries listed in `_ARRAY_CONFIG_KEYS` are converted to float64 arrays once, here, instead of
+            in every `run_*` function.
+            The parsed configuration is cached by the modification time of the file, so repeated loads in the same
+            interpreter skip the parse and return the same dictionary.
+    """
+    config_path = Path(config_path).resolve()
+    mtime_ns = config_path.stat().st_mtime_ns
+    cached = _config_cache.get(config_path)
+    if cached is None or cached[0] != mtime_ns:
+        cached = (mtime_ns, _coerce_config(_loads(config_path.read_bytes())))
+        _config_cache[config_path] = cached
+    return cached[1]
+
+
+# Environments built by `_environment_cached`, by id, so lattices can be cached by the id of their environment
+_environments_by_id = weakref.WeakValueDictionary()
+
+
+@functools.lru_cache(maxsize=4)
+def _environment_cached(obstacle_file_path, mtime_ns, margin_of_safety):
+    """Builds the environment data for an obstacle file, reusing it for repeated calls with the same arguments
+
+    Args:
+            obstacle_file_path (str): The resolved file path of the obstacle data
+            mtime_ns (int): The modification time of the obstacle file, so an edited file is read again
+            margin_of_safety (float): The safety margin around obstacles
+
+    Returns:
+            EnvironmentData: An object encapsulating the obstacle set geometry and associated metadata
+    """
+    from .environment_data import EnvironmentData
+
+    environment_data = EnvironmentData(obstacle_file_path, margin_of_safety)
+    _environments_by_id[id(environment_data)] = environment_data
+    # Once the environment is gone its id may be reused, so the lattices cached for it must be dropped
+    weakref.finalize(environment_data, _lattice_cached.cache_clear)
+    return environment_data
+
+
+@functools.lru_cache(maxsize=4)
+def _lattice_cached(environment_id, center, halfsizes, resolution, connectivity):
+    """Builds a lattice in an environment built by `_environment_cached`, reusing it for repeated calls with the same arguments
+
+    Args:
+            environment_id (int): The id of the environment data
+            center (tuple): The center coordinates of the lattice volume
+            halfsizes (tuple): The half-size dimensions of the lattice volume
+            resolution (float): The spacing between lattice points
+            connectivity (str): The type of lattice connectivity ("full" or "partial")
+
+    Returns:
+            CubicLattice: A graph structure encapsulating free-space
+    """
+    import numpy as np
+
+    from .lattice import CubicLattice
+
+    return CubicLattice(
+        _environments_by_id[environment_id],
+        np.array(center),
+        np.array(halfsizes),
+        resolution,
+        connectivity,
+    )
+
+
+def run_obstacle_data(obstacle_file_path, margin_of_safety, visualize=True):
     """ "Demonstrates the obstacle data processing module
 
     Args:
             obstacle_file_path (str): The file path of the obstacle data
             margin_of_safety (float): The safety margin around obstacles
+            visualize (bool): Whether to render the obstacle set
 
     Returns:
             ObstacleData: An object encapsulating the obstacle set geometry and associated metadata
+
+    Note:
+            The environment data is cached, so running the step again with the same arguments reuses it until the
+            obstacle file is modified.
     """
-    enivronment_data = EnvironmentData(obstacle_file_path, margin_of_safety)
+    obstacle_file_path = Path(obstacle_file_path).resolve()
+    enivronment_data = _environment_cached(
+        str(obstacle_file_path),
+        obstacle_file_path.stat().st_mtime_ns,
+        float(margin_of_safety),
+    )
     
     print("\nHere is a summary of the obstacle metadata: ")
     enivronment_data.summary()
     
-    print("\nGenerating 3D visualization....")
-    enivronment_data.visualize()
+    if visualize:
+        print("\nGenerating 3D visualization....")
+        enivronment_data.visualize()
 
     return enivronment_data
 
 
-def run_lattice(environment_data, center, halfsizes, resolution, connectivity):
+def run_lattice(
+    environment_data, center, halfsizes, resolution, connectivity, visualize=True
+):
     """Demonstrates the free-space construction module
 
     Args:
@@ -39,22 +171,41 @@ def run_lattice(environment_data, center, halfsizes, resolution, connectivity):
             halfsizes (list): The half-size dimensions of the lattice volume
             resolution (float): The spacing between lattice points
             connectivity (str): The type of lattice connectivity ("full" or "partial")
+            visualize (bool): Whether to render the lattice
 
     Returns:
             CubicLattice: A graph structure encapsulating free-space
+
+    Note:
+            When the environment data was built by `run_obstacle_data`, the lattice is cached, so running the step again
+            with the same arguments reuses it.
     """
-    center_np = np.array(center)
-    halfsizes_np = np.array(halfsizes)
-    lattice = CubicLattice(
-        environment_data, center_np, halfsizes_np, resolution, connectivity
-    )
+    import numpy as np
+
+    from .lattice import CubicLattice
+
+    center_np = np.asarray(center, dtype=np.float64)
+    halfsizes_np = np.asarray(halfsizes, dtype=np.float64)
+    if _environments_by_id.get(id(environment_data)) is environment_data:
+        lattice = _lattice_cached(
+            id(environment_data),
+            tuple(center_np.tolist()),
+            tuple(halfsizes_np.tolist()),
+            float(resolution),
+            connectivity,
+        )
+    else:
+        lattice = CubicLattice(
+            environment_data, center_np, halfsizes_np, resolution, connectivity
+        )
     
-    print("\nGenerating 3D visualization....")
-    lattice.visualize(environment_data)
+    if visualize:
+        print("\nGenerating 3D visualization....")
+        lattice.visualize(environment_data)
     return lattice
 
 
-def run_astar(environment_data, lattice, start_gps, goal_gps):
+def run_astar(environment_data, lattice, start_gps, goal_gps, visualize=True):
     """Demonstrates the A* search module
 
     Args:
@@ -62,17 +213,24 @@ def run_astar(environment_data, lattice, start_gps, goal_gps):
             lattice (CubicLattice): A graph structure encapsulating free-space
             start_gps (list): The starting GPS coordinates [lon, lat, alt]
             goal_gps (list): The goal GPS coordinates [lon, lat, alt]
+            visualize (bool): Whether to render the lattice with the path
 
     Returns:
             list: A waypoint path
     """
-    start_gps_np = np.array(start_gps)
-    goal_gps_np = np.array(goal_gps)
+    import numpy as np
+
+    from .a_star_search import astar
+    from .utils import euclidean_distance
+
+    start_gps_np = np.asarray(start_gps, dtype=np.float64)
+    goal_gps_np = np.asarray(goal_gps, dtype=np.float64)
     optimal_path = astar(
         lattice, start_gps_np, goal_gps_np, euclidean_distance
     )
-    print("\nGenerating 3D visualization....")
-    lattice.visualize(environment_data, path=optimal_path)
+    if visualize:
+        print("\nGenerating 3D visualization....")
+        lattice.visualize(environment_data, path=optimal_path)
 
     return optimal_path
 
@@ -84,6 +242,7 @@ def run_prm(
     density,
     neighbors,
     visualization_bounds,
+    visualize=True,
 ):
     """Demonstrate the PRM search module
 
@@ -94,235 +253,273 @@ def run_prm(
             density (float): The target density for nodes in free-space
             neighbors (int): The branching factor for the PRM graph
             visualization_bounds (list): The bounds for the visualization [xmin, ymin, zmin, xmax, ymax, zmax]
+            visualize (bool): Whether to render the roadmap before and after the search
     """
+    import numpy as np
+
+    from .a_star_search import astar
+    from .prm import PRM
+    from .utils import euclidean_distance
+
     roadmap = PRM(environment_data, DENSITY=density, NEIGHBORS=neighbors)
-    print("\nGenerating 3D visualization....")
-    roadmap.visualize(visualization_bounds)
+    if visualize:
+        print("\nGenerating 3D visualization....")
+        roadmap.visualize(visualization_bounds)
     print("\nSearching PRM with A*...")
-    prm_path = astar(roadmap, start_gps, goal_gps, euclidean_distance)
-    print("\nGenerating 3D visualization....")
-    roadmap.visualize(visualization_bounds, path=prm_path)
+    prm_path = astar(
+        roadmap,
+        np.asarray(start_gps, dtype=np.float64),
+        np.asarray(goal_gps, dtype=np.float64),
+        euclidean_distance,
+    )
+    if visualize:
+        print("\nGenerating 3D visualization....")
+        roadmap.visualize(visualization_bounds, path=prm_path)
 
     return prm_path
 
 
-def run_trajectory(waypoints, average_speed, output_directory):
+def run_trajectory(
+    waypoints, average_speed, output_directory, visualize=True, plot=False
+):
     """Demonstrate the trajectory planning module
 
     Args:
             waypoints (list): A list of waypoints
             average_speed (float): The average speed to enforce along the trajectory
             output_directory (str): The directory where trajectory data will be stored
+            visualize (bool): Whether to show the trajectory profiles
+            plot (bool): Whether to save the trajectory profiles to `trajectory_profiles.png` in the output directory
+
+    Note:
+            The 3D trajectory and its velocity, acceleration, jerk, and snap profiles are drawn into a single figure. When
+            the figure is only saved, matplotlib is switched to the non-interactive Agg backend.
     """
+    from .trajectory import TrajectoryPlanner
+
     planner = TrajectoryPlanner(waypoints)
     planner.allocate_time(average_speed)
     trajectory = planner.compute_complete_trajectory()
     print("Saving...")
-    trajectory.save_trajectory_to_files("data/output/")
+    trajectory.save_trajectory_to_files(os.path.join(output_directory, ""))
     print("Save complete")
 
     # Plot the trajectory
-    print("Generating plots of trajectory profiles")
-    trajectory.plot_3d_trajectory()
-    trajectory.plot_velocity()
-    trajectory.plot_acceleration()
-    trajectory.plot_jerk()
-    trajectory.plot_snap()
-
-def main():
-    print("========== WELCOME ========== ")
-    print("Welcome to a demonstration of Ronen Aniti's motion planning pipeline.")
-
-    config_path = Path("config.json")
-    config_data = None
-    environment_data = None
-    lattice = None
-    optimal_path = None
-    prm_path = None
+    if visualize or plot:
+        if not visualize:
+            import matplotlib
+
+            if matplotlib.get_backend().lower() != "agg":
+                matplotlib.use("Agg")
+        print("Generating plots of trajectory profiles")
+        trajectory.plot_profiles(
+            file_path=(
+                os.path.join(output_directory, "trajectory_profiles.png")
+                if plot
+                else None
+            ),
+            show=visualize,
+        )
+
+
+# The steps of the pipeline after loading the configuration. Each step is a tuple of its title, the action offered by
+# its [D] prompt, its section of the configuration, the function that runs it, a function that maps its configuration
+# section and the results of the earlier steps to the arguments of that function, and the name under which its result
+# is passed to the later steps (None if it is not needed)
+STEPS = [
+    (
+        "Load and visualize obstacle data",
+        "load and visualize obstacle data",
+        "environment",
+        run_obstacle_data,
+        lambda section, results: dict(
+            obstacle_file_path=section["obstacle_file"],
+            margin_of_safety=section["margin_of_safety"],
+        ),
+        "environment_data",
+    ),
+    (
+        "Construct a map of free space",
+        "demonstrate the lattice construction module",
+        "lattice",
+        run_lattice,
+        lambda section, results: dict(
+            environment_data=results["environment_data"],
+            center=section["center"],
+            halfsizes=section["halfsizes"],
+            resolution=section["resolution"],
+            connectivity=section["connectivity"],
+        ),
+        "lattice",
+    ),
+    (
+        "Search for a navigable route with A*",
+        "demonstrate the A* search module",
+        "astar",
+        run_astar,
+        lambda section, results: dict(
+            environment_data=results["environment_data"],
+            lattice=results["lattice"],
+            start_gps=section["start_gps"],
+            goal_gps=section["goal_gps"],
+        ),
+        "optimal_path",
+    ),
+    (
+        "Plan a path with PRM",
+        "execute PRM and visualize the roadmap",
+        "prm",
+        run_prm,
+        lambda section, results: dict(
+            environment_data=results["environment_data"],
+            start_gps=section["start_gps"],
+            goal_gps=section["goal_gps"],
+            density=section["density"],
+            neighbors=section["neighbors"],
+            visualization_bounds=section["visualization_bounds"],
+        ),
+        "prm_path",
+    ),
+    (
+        "Generate a trajectory between waypoints",
+        "generate and visualize trajectory",
+        "trajectory",
+        run_trajectory,
+        lambda section, results: dict(
+            waypoints=section["waypoints"],
+            average_speed=section["average_speed"],
+            output_directory=section["output_directory"],
+            plot=section.get("plot", False),
+        ),
+        None,
+    ),
+]
+
+
+def _execute_step(step, config_data, results):
+    """Runs one step of the pipeline and reports how long it took
 
-    # ===== 1. Demonstrate loading of the configuration file ======
-    while True:
-        print("\n--- Step 1: Load the configuration file ---")
-        print("Press [D] to load configuration")
-        print("Press [E] to exit")
-
-        user_input = input("Your choice: ").strip().lower()
+    Args:
+            step (tuple): An entry of `STEPS`
+            config_data (dict): The parsed configuration
+            results (dict): The results of the earlier steps, to which the result of this step is added
+    """
+    label, _, config_key, runner, arg_mapper, result_key = step
+    start = time.perf_counter()
+    result = runner(
+        **arg_mapper(config_data[config_key], results),
+        visualize=config_data.get("visualize", False),
+    )
+    print(f"{label} completed in {time.perf_counter() - start:.3f} s")
+    if result_key is not None:
+        results[result_key] = result
 
-        if user_input == 'd':
-            try:
-                with open(config_path, "r") as f:
-                    config_data = json.load(f)
-                print("Configuration successfully loaded.")
-                break
-            except FileNotFoundError:
-                print("Error: Configuration file not found.")
-            except json.JSONDecodeError:
-                print("Error: Could not decode JSON.")
-        elif user_input == 'e':
-            print("Program terminating")
-            return
-        else:
-            print("Invalid input. Please press [D] or [E].")
 
-    # ===== 2. Demonstrate the obstacle processing module ======
-    while True:
-        print("\n--- Step 2: Load and visualize obstacle data ---")
-        print("Press [D] to load and visualize obstacle data")
-        print("Press [E] to exit")
+def _prompt(step_number, label, action):
+    """Prompts the user to run or skip a step until they make a valid choice
 
-        user_input = input("Your choice: ").strip().lower()
+    Args:
+            step_number (int): The number of the step
+            label (str): The title of the step
+            action (str): The action offered by the [D] choice
 
-        if user_input == 'd':
-            try:
-                env_config = config_data.get("environment")
-                if not env_config:
-                    print("Error: Missing 'environment' config field.")
-                    continue
-                
-                environment_data = run_obstacle_data(
-                    obstacle_file_path=env_config["obstacle_file"],
-                    margin_of_safety=env_config["margin_of_safety"]
-                )
-                break
-            except Exception as e:
-                print(f"Error: Failed to load obstacle data: {e}")
-        elif user_input == 'e':
-            print("Program terminating")
-            return
-        else:
-            print("Invalid input. Please press [D] or [E].")
-            
-    # ===== 3. Demonstrate the lattice construction module ======
+    Returns:
+            bool: True if the user chose to run the step, False if they chose to exit
+    """
     while True:
-        print("\n--- Step 3: Construct a map of free space ---")
-        print("Press [D] to demonstrate the lattice construction module")
+        print(f"\n--- Step {step_number}: {label} ---")
+        print(f"Press [D] to {action}")
         print("Press [E] to exit")
 
         user_input = input("Your choice: ").strip().lower()
 
-        if user_input == 'd':
-            try:
-                lattice_config = config_data.get("lattice")
-                if not lattice_config:
-                    print("Error: Missing 'lattice' config field.")
-                    continue
-                
-                lattice = run_lattice(
-                    environment_data=environment_data,
-                    center=lattice_config["center"],
-                    halfsizes=lattice_config["halfsizes"],
-                    resolution=lattice_config["resolution"],
-                    connectivity=lattice_config["connectivity"]
-                )
-                break
-            except Exception as e:
-                print(f"Error: Failed to construct lattice: {e}")
-        elif user_input == 'e':
+        if user_input == "d":
+            return True
+        if user_input == "e":
             print("Program terminating")
-            return
-        else:
-            print("Invalid input. Please press [D] or [E].")
-               
-    # ===== 4. Demonstrate the A* search module ======
-    while True:
-        print("\n--- Step 4: Search for a navigable route with A* ---")
-        print("Press [D] demonstrate the A* search module")
-        print("Press [E] to exit")
+            return False
+        print("Invalid input. Please press [D] or [E].")
 
-        user_input = input("Your choice: ").strip().lower()
 
-        if user_input == 'd':
-            try:
+def _run_step(step_number, step, config_data, results):
+    """Prompts the user for one step of the pipeline and runs it until it succeeds or the user exits
 
-                astar_config = config_data.get("astar")
-                if not astar_config:
-                    print("Error: Missing 'astar' config section.")
-                    continue
+    Args:
+            step_number (int): The number of the step
+            step (tuple): An entry of `STEPS`
+            config_data (dict): The parsed configuration
+            results (dict): The results of the earlier steps, to which the result of this step is added
 
-                optimal_path = run_astar(
-                    environment_data=environment_data,
-                    lattice=lattice,
-                    start_gps=astar_config["start_gps"],
-                    goal_gps=astar_config["goal_gps"]
-                )
-                print("A* pathfinding completed.")
-                break
+    Returns:
+            bool: True if the step succeeded, False if the user chose to exit
+    """
+    label, action, config_key = step[:3]
+    while _prompt(step_number, label, action):
+        if not config_data.get(config_key):
+            print(f"Error: Missing '{config_key}' config section.")
+            continue
+        try:
+            _execute_step(step, config_data, results)
+            return True
+        except Exception as e:
+            print(f"Error: {label} failed: {e}")
+    return False
+
+
+def run_full_mission(config_data):
+    """Runs every step of the pipeline in order without prompting the user or rendering
 
-            except Exception as e:
-                print(f"A* search failed: {e}")
+    Args:
+            config_data (dict): The parsed configuration
 
-        elif user_input == 'e':
-            print("Program terminating")
-            return
+    Returns:
+            dict: The environment data, lattice, A* path, and PRM path produced by the pipeline
 
-        else:
-            print("Invalid input. Please press [D] or [E].")
-    
-    # ===== 5. Demonstrate the PRM module ======
-    while True:
-        print("\n--- Step 5: Plan a path with PRM ---")
-        print("Press [D] to execute PRM and visualize the roadmap")
-        print("Press [E] to exit")
+    Note:
+            The `visualize` key of the configuration is ignored, since showing a figure blocks until it is closed. The
+            trajectory profiles are still saved when the `plot` key of the `trajectory` section is set.
+    """
+    config_data = {**config_data, "visualize": False}
+    results = {}
+    for step in STEPS:
+        _execute_step(step, config_data, results)
+    return results
 
-        user_input = input("Your choice: ").strip().lower()
 
-        if user_input == 'd':
-            try:
-                prm_config = config_data.get("prm")
-                if not prm_config:
-                    print("Error: Missing 'prm' config section.")
-                    continue
-
-                prm_path = run_prm(
-                    environment_data=environment_data,
-                    start_gps=prm_config["start_gps"],
-                    goal_gps=prm_config["goal_gps"],
-                    density=prm_config["density"],
-                    neighbors=prm_config["neighbors"],
-                    visualization_bounds=prm_config["visualization_bounds"]
-                )
-                print("PRM search completed.")
-                break
-
-            except Exception as e:
-                print(f"PRM search failed: {e}")
-
-        elif user_input == 'e':
-            print("Program terminating")
-            return
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Demonstrate Ronen Aniti's motion planning pipeline."
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="run every step of the pipeline without prompting or rendering",
+    )
+    args = parser.parse_args(argv)
 
-        else:
-            print("Invalid input. Please press [D] or [E].")
-            
-    # ===== 6. Demonstrate the trajectory module ======
-    while True:
-        print("\n--- Step 6: Generate a trajectory between waypoints ---")
-        print("Press [D] to generate and visualize trajectory")
-        print("Press [E] to exit")
+    config_path = Path("config.json")
+    if args.batch:
+        run_full_mission(load_config(config_path))
+        return
 
-        user_input = input("Your choice: ").strip().lower()
+    print("========== WELCOME ========== ")
+    print("Welcome to a demonstration of Ronen Aniti's motion planning pipeline.")
 
-        if user_input == 'd':
-            try:
-                trajectory_config = config_data.get("trajectory")
-                if not trajectory_config:
-                    print("Error: Missing 'trajectory' config section.")
-                    continue
-
-                run_trajectory(
-                    waypoints=trajectory_config["waypoints"],
-                    average_speed=trajectory_config["average_speed"],
-                    output_directory=trajectory_config["output_directory"]
-                )
-                print("Trajectory generated and saved.")
-                break
-
-            except Exception as e:
-                print(f"Trajectory planning failed: {e}")
-
-        elif user_input == 'e':
-            print("Program terminating")
+    # ===== 1. Demonstrate loading of the configuration file ======
+    config_data = None
+    while config_data is None:
+        if not _prompt(1, "Load the configuration file", "load configuration"):
+            return
+        try:
+            config_data = load_config(config_path)
+            print("Configuration successfully loaded.")
+        except FileNotFoundError:
+            print("Error: Configuration file not found.")
+        except json.JSONDecodeError:
+            print("Error: Could not decode JSON.")
+
+    # ===== 2-6. Demonstrate the obstacle processing, lattice, A*, PRM, and trajectory modules ======
+    results = {}
+    for step_number, step in enumerate(STEPS, start=2):
+        if not _run_step(step_number, step, config_data, results):
             return
-
-        else:
-            print("Invalid input. Please press [D] or [E].")
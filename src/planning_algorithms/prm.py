@@ -6,6 +6,7 @@ from .utils import (
     global_to_local,
     collision_check_vectorized,
     collision_check_two_points,
+    edges_to_csr,
     euclidean_distance,
 )
 from .a_star_search import astar
@@ -45,6 +46,9 @@ class PRM:
             SAMPLES (int): the number of samples to take in the free space of the environment
             NEIGHBORS (int): the number of neighbors to connect for each node in the PRM
             graph (dict): a dictionary representing the graph structure of the PRM
+            indptr (numpy.ndarray): offsets of each node's neighbors in the CSR form of the graph
+            indices (numpy.ndarray): neighbor indices of the CSR form of the graph
+            weights (numpy.ndarray): edge lengths of the CSR form of the graph
             points (list): a list of points in the free space of the environment
             free_space_points (list): a list of points in the free space of the environment
             free_space_points_kd_tree (scipy.spatial.KDTree): a KDTree object for efficient nearest neighbor search in the free space points
@@ -134,6 +138,19 @@ class PRM:
                         self.graph[index1] = {}
                     self.graph[index1][index2] = distance
 
+        # Mirror the graph in CSR form for the graph search functions
+        sources = []
+        targets = []
+        distances = []
+        for index1, neighbors in self.graph.items():
+            for index2, distance in neighbors.items():
+                sources.append(index1)
+                targets.append(index2)
+                distances.append(distance)
+        self.indptr, self.indices, self.weights = edges_to_csr(
+            len(self.points), sources, targets, distances
+        )
+
     def visualize(self, bounds, path=None):
         """
         Visualize the PRM in 3D with optional path highlighting.
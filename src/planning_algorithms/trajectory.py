@@ -70,9 +70,13 @@ class Trajectory:
 
         return [x_pos, y_pos, z_pos]
 
-    def plot_3d_trajectory(self):
+    def plot_3d_trajectory(self, ax=None):
         """
         Plot the trajectory in 3D space.
+
+        Args:
+            ax (mpl_toolkits.mplot3d.axes3d.Axes3D): the 3D axes to plot into. If None, the plot is drawn in a new figure
+                that is shown.
         """
         normalized_times = np.linspace(
             self.normalized_time[0], self.normalized_time[-1], 1000
@@ -81,8 +85,10 @@ class Trajectory:
 
         x_positions, y_positions, z_positions = zip(*positions)
 
-        fig = plt.figure(figsize=(10, 8))
-        ax = fig.add_subplot(111, projection="3d")
+        show = ax is None
+        if show:
+            fig = plt.figure(figsize=(10, 8))
+            ax = fig.add_subplot(111, projection="3d")
         ax.plot(x_positions, y_positions, z_positions)
         ax.scatter(
             [p[0] for p in self.points],
@@ -103,7 +109,34 @@ class Trajectory:
         ax.set_zlabel("Z Position")
         ax.set_title("3D Trajectory")
 
-        plt.show()
+        if show:
+            plt.show()
+
+    def plot_profiles(self, file_path=None, show=True):
+        """
+        Plot the 3D trajectory and the velocity, acceleration, jerk, and snap profiles in a single figure.
+
+        Args:
+            file_path (str): the path of the image file to save the figure to. If None, the figure is not saved.
+            show (bool): whether to show the figure. If False, the figure is closed once it has been saved.
+
+        Note:
+            Drawing every plot into one figure renders and saves them in one pass, instead of opening five figures.
+        """
+        fig = plt.figure(figsize=(10, 30))
+        self.plot_3d_trajectory(ax=fig.add_subplot(5, 1, 1, projection="3d"))
+        self.plot_velocity(ax=fig.add_subplot(5, 1, 2))
+        self.plot_acceleration(ax=fig.add_subplot(5, 1, 3))
+        self.plot_jerk(ax=fig.add_subplot(5, 1, 4))
+        self.plot_snap(ax=fig.add_subplot(5, 1, 5))
+        fig.tight_layout()
+
+        if file_path is not None:
+            fig.savefig(file_path)
+        if show:
+            plt.show()
+        else:
+            plt.close(fig)
 
     def compute_velocity(self, time):
         """
@@ -208,9 +241,12 @@ class Trajectory:
 
         return [x_snap, y_snap, z_snap]
 
-    def plot_velocity(self):
+    def plot_velocity(self, ax=None):
         """
         Plot velocity vs. time.
+
+        Args:
+            ax (matplotlib.axes.Axes): the axes to plot into. If None, the plot is drawn in a new figure that is shown.
         """
         normalized_times = np.linspace(
             self.normalized_time[0], self.normalized_time[-1], 1000
@@ -219,20 +255,26 @@ class Trajectory:
 
         x_velocities, y_velocities, z_velocities = zip(*velocities)
 
-        plt.figure(figsize=(10, 6))
-        plt.plot(normalized_times, x_velocities, label="X Velocity")
-        plt.plot(normalized_times, y_velocities, label="Y Velocity")
-        plt.plot(normalized_times, z_velocities, label="Z Velocity")
-        plt.xlabel("Normalized Time")
-        plt.ylabel("Velocity")
-        plt.title("Velocity vs. Normalized Time")
-        plt.legend()
-        plt.grid(True)
-        plt.show()
-
-    def plot_acceleration(self):
+        show = ax is None
+        if show:
+            _, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(normalized_times, x_velocities, label="X Velocity")
+        ax.plot(normalized_times, y_velocities, label="Y Velocity")
+        ax.plot(normalized_times, z_velocities, label="Z Velocity")
+        ax.set_xlabel("Normalized Time")
+        ax.set_ylabel("Velocity")
+        ax.set_title("Velocity vs. Normalized Time")
+        ax.legend()
+        ax.grid(True)
+        if show:
+            plt.show()
+
+    def plot_acceleration(self, ax=None):
         """
         Plot acceleration vs. time.
+
+        Args:
+            ax (matplotlib.axes.Axes): the axes to plot into. If None, the plot is drawn in a new figure that is shown.
         """
         normalized_times = np.linspace(
             self.normalized_time[0], self.normalized_time[-1], 1000
@@ -243,20 +285,26 @@ class Trajectory:
 
         x_accelerations, y_accelerations, z_accelerations = zip(*accelerations)
 
-        plt.figure(figsize=(10, 6))
-        plt.plot(normalized_times, x_accelerations, label="X Acceleration")
-        plt.plot(normalized_times, y_accelerations, label="Y Acceleration")
-        plt.plot(normalized_times, z_accelerations, label="Z Acceleration")
-        plt.xlabel("Normalized Time")
-        plt.ylabel("Acceleration")
-        plt.title("Acceleration vs. Normalized Time")
-        plt.legend()
-        plt.grid(True)
-        plt.show()
-
-    def plot_jerk(self):
+        show = ax is None
+        if show:
+            _, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(normalized_times, x_accelerations, label="X Acceleration")
+        ax.plot(normalized_times, y_accelerations, label="Y Acceleration")
+        ax.plot(normalized_times, z_accelerations, label="Z Acceleration")
+        ax.set_xlabel("Normalized Time")
+        ax.set_ylabel("Acceleration")
+        ax.set_title("Acceleration vs. Normalized Time")
+        ax.legend()
+        ax.grid(True)
+        if show:
+            plt.show()
+
+    def plot_jerk(self, ax=None):
         """
         Plot jerk vs. time.
+
+        Args:
+            ax (matplotlib.axes.Axes): the axes to plot into. If None, the plot is drawn in a new figure that is shown.
         """
         normalized_times = np.linspace(
             self.normalized_time[0], self.normalized_time[-1], 1000
@@ -265,20 +313,26 @@ class Trajectory:
 
         x_jerks, y_jerks, z_jerks = zip(*jerks)
 
-        plt.figure(figsize=(10, 6))
-        plt.plot(normalized_times, x_jerks, label="X Jerk")
-        plt.plot(normalized_times, y_jerks, label="Y Jerk")
-        plt.plot(normalized_times, z_jerks, label="Z Jerk")
-        plt.xlabel("Normalized Time")
-        plt.ylabel("Jerk")
-        plt.title("Jerk vs. Normalized Time")
-        plt.legend()
-        plt.grid(True)
-        plt.show()
-
-    def plot_snap(self):
+        show = ax is None
+        if show:
+            _, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(normalized_times, x_jerks, label="X Jerk")
+        ax.plot(normalized_times, y_jerks, label="Y Jerk")
+        ax.plot(normalized_times, z_jerks, label="Z Jerk")
+        ax.set_xlabel("Normalized Time")
+        ax.set_ylabel("Jerk")
+        ax.set_title("Jerk vs. Normalized Time")
+        ax.legend()
+        ax.grid(True)
+        if show:
+            plt.show()
+
+    def plot_snap(self, ax=None):
         """
         Plot snap vs. time.
+
+        Args:
+            ax (matplotlib.axes.Axes): the axes to plot into. If None, the plot is drawn in a new figure that is shown.
         """
         normalized_times = np.linspace(
             self.normalized_time[0], self.normalized_time[-1], 1000
@@ -287,16 +341,19 @@ class Trajectory:
 
         x_snaps, y_snaps, z_snaps = zip(*snaps)
 
-        plt.figure(figsize=(10, 6))
-        plt.plot(normalized_times, x_snaps, label="X snap")
-        plt.plot(normalized_times, y_snaps, label="Y snap")
-        plt.plot(normalized_times, z_snaps, label="Z snap")
-        plt.xlabel("Normalized Time")
-        plt.ylabel("snap")
-        plt.title("snap vs. Normalized Time")
-        plt.legend()
-        plt.grid(True)
-        plt.show()
+        show = ax is None
+        if show:
+            _, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(normalized_times, x_snaps, label="X snap")
+        ax.plot(normalized_times, y_snaps, label="Y snap")
+        ax.plot(normalized_times, z_snaps, label="Z snap")
+        ax.set_xlabel("Normalized Time")
+        ax.set_ylabel("snap")
+        ax.set_title("snap vs. Normalized Time")
+        ax.legend()
+        ax.grid(True)
+        if show:
+            plt.show()
 
     def save_trajectory_to_files(self, relative_path):
         """
@@ -602,7 +659,6 @@ class TrajectoryPlanner:
             ]
         )
         b[6 + n - 1] = xs[-1]
-        print(6 + n - 1)
         # Enforce continuity at each of the N - 2 intermediate points for derivatives 0, 1, 2, 3, 4, 5, 6
         # This yields 7x(N - 2) more equations
         # The total count of equations is thus N + 6 + 7(N-2), which equals 8N - 8 (or 8(N-1), where N-1 is the number
@@ -2,9 +2,35 @@
 This module is an implementation of various helper functions used by other modules of the package.
 """
 
+import functools
+import math
+
 import numpy as np
 import utm
 
+from .utils_numba import NUMBA_AVAILABLE, _collision_point, _collision_segment
+
+# Scratch arrays keyed by (name, shape, dtype), reused by the NumPy collision checks. Not safe to share between threads.
+_scratch_buffers = {}
+
+
+def _scratch_buffer(name, shape, dtype):
+    """
+    Return a reusable scratch array of the given shape and data type.
+
+    Args:
+        name (str): the name of the scratch array, so one function can hold several scratch arrays of the same shape
+        shape (tuple): the shape of the scratch array
+        dtype (numpy.dtype): the data type of the scratch array
+
+    Returns:
+        numpy.ndarray: an uninitialized array that is returned again by later calls with the same name, shape, and data type
+    """
+    key = (name, shape, np.dtype(dtype))
+    if key not in _scratch_buffers:
+        _scratch_buffers[key] = np.empty(shape, dtype=dtype)
+    return _scratch_buffers[key]
+
 
 def collision_check_basic(environment_data_object, point):
     """
@@ -23,19 +49,9 @@ def collision_check_basic(environment_data_object, point):
         The drawbacks are that it is not vectorized and may be slow for large environments with many obstacles.
     """
     for idx, obstacle_center in enumerate(environment_data_object.centers):
-        if (
-            abs(point[0] - obstacle_center[0])
-            <= environment_data_object.halfsizes[idx, 0]
-        ):
-            if (
-                abs(point[1] - obstacle_center[1])
-                <= environment_data_object.halfsizes[idx, 1]
-            ):
-                if (
-                    abs(point[1] - obstacle_center[2])
-                    <= environment_data_object.halfsizes[idx, 2]
-                ):
-                    return True
+        deltas = np.abs(point - obstacle_center)
+        if (deltas <= environment_data_object.halfsizes[idx]).all():
+            return True
     return False
 
 
@@ -54,14 +70,135 @@ def collision_check_vectorized(environment_data_object, point):
         This function uses vectorized operations to check if the point is in collision with any of the obstacles in the environment.
         The benefits of this function are that it is more efficient than the basic collision check function and is easy to understand.
         The drawbacks are that it may be slower than the KDTree collision check function for some environments.
+        When Numba is installed, the check is delegated to a compiled kernel that exits on the first obstacle hit.
+        Callers that run many checks against one environment can use `EnvironmentData.collision_kernel` instead.
     """
-
-    broadcasted_point = np.tile(point, (len(environment_data_object.centers), 1))
-    deltas = np.abs(broadcasted_point - environment_data_object.centers)
-    collision_conditions = deltas <= environment_data_object.halfsizes
+    if NUMBA_AVAILABLE:
+        return _collision_point(
+            environment_data_object.lower_corners,
+            environment_data_object.upper_corners,
+            np.asarray(point, dtype=np.float64),
+        )
+
+    # The point broadcasts against the (m, 3) obstacle corners, and the intermediate results are written into scratch
+    # buffers that are reused across calls instead of allocating new arrays on every call
+    lower_corners = environment_data_object.lower_corners
+    above_lower = np.greater_equal(
+        point,
+        lower_corners,
+        out=_scratch_buffer("above_lower", lower_corners.shape, bool),
+    )
+    below_upper = np.less_equal(
+        point,
+        environment_data_object.upper_corners,
+        out=_scratch_buffer("below_upper", lower_corners.shape, bool),
+    )
+    collision_conditions = np.logical_and(above_lower, below_upper, out=above_lower)
     return np.any(np.all(collision_conditions, axis=1))
 
 
+def collision_check_batch(environment_data_object, points, chunk_size=1024):
+    """
+    Check which of a set of points are in collision with the environment.
+
+    Args:
+        environment_data_object (EnvironmentData): an object of the EnvironmentData class
+        points (numpy.ndarray): a numpy array of shape (n, 3) containing the points to check
+        chunk_size (int): the number of points tested against the obstacle set at once
+
+    Returns:
+        numpy.ndarray: a boolean array of shape (n,) indicating which points are in collision with the environment
+
+    Note:
+        This function broadcasts a chunk of points of shape (chunk_size, 1, 3) against the obstacle corners of shape (1, m, 3),
+        so the whole chunk is tested in a single NumPy pass instead of one Python call per point.
+        The chunking caps the size of the (chunk_size, m, 3) intermediate array for environments with many obstacles.
+        Each chunk is only tested against the obstacles that overlap the bounding box of the chunk, which is cheap to compute
+        and removes most of the obstacle set when the points of a chunk are close together (e.g. lattice points or edge samples).
+    """
+    points = np.asarray(points)
+    lower_corners = environment_data_object.lower_corners
+    upper_corners = environment_data_object.upper_corners
+    in_collision = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(points), chunk_size):
+        chunk = points[start : start + chunk_size]
+        nearby = np.all(
+            (upper_corners >= chunk.min(axis=0))
+            & (lower_corners <= chunk.max(axis=0)),
+            axis=1,
+        )
+        if not np.any(nearby):
+            continue
+        chunk = chunk[:, None, :]
+        in_collision[start : start + chunk_size] = np.any(
+            np.all(
+                (chunk >= lower_corners[None, nearby, :])
+                & (chunk <= upper_corners[None, nearby, :]),
+                axis=2,
+            ),
+            axis=1,
+        )
+    return in_collision
+
+
+def collision_check_segments(environment_data_object, points1, points2, chunk_size=1024):
+    """
+    Check which of a set of line segments intersect an obstacle of the environment.
+
+    Args:
+        environment_data_object (EnvironmentData): an object of the EnvironmentData class
+        points1 (numpy.ndarray): a numpy array of shape (n, 3) containing the start points of the segments
+        points2 (numpy.ndarray): a numpy array of shape (n, 3) containing the end points of the segments
+        chunk_size (int): the number of segments tested against the obstacle set at once
+
+    Returns:
+        numpy.ndarray: a boolean array of shape (n,) indicating which segments intersect an obstacle
+
+    Note:
+        This function is exact: each segment is clipped against each obstacle box with the slab method, so a segment that
+        only clips the corner of a box is found, however short the clipped part is, unlike with sampled test points.
+        As in `collision_check_batch`, each chunk of segments is only tested against the obstacles that overlap the
+        bounding box of the chunk.
+    """
+    points1 = np.asarray(points1, dtype=np.float64)
+    points2 = np.asarray(points2, dtype=np.float64)
+    lower_corners = environment_data_object.lower_corners
+    upper_corners = environment_data_object.upper_corners
+    in_collision = np.zeros(len(points1), dtype=bool)
+    for start in range(0, len(points1), chunk_size):
+        origins = points1[start : start + chunk_size]
+        ends = points2[start : start + chunk_size]
+        nearby = np.all(
+            (upper_corners >= np.minimum(origins, ends).min(axis=0))
+            & (lower_corners <= np.maximum(origins, ends).max(axis=0)),
+            axis=1,
+        )
+        if not np.any(nearby):
+            continue
+        lower = lower_corners[None, nearby, :]
+        upper = upper_corners[None, nearby, :]
+        origins = origins[:, None, :]
+        directions = ends[:, None, :] - origins
+
+        # The segment origin + t * direction, 0 <= t <= 1, is inside a box while t is inside the slab of every axis.
+        # On an axis the segment does not move along, the slab is everything or nothing.
+        parallel = directions == 0
+        inside_slab = (origins >= lower) & (origins <= upper)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_lower = (lower - origins) / directions
+            t_upper = (upper - origins) / directions
+        t_enter = np.where(
+            parallel, np.where(inside_slab, -np.inf, np.inf), np.minimum(t_lower, t_upper)
+        )
+        t_exit = np.where(
+            parallel, np.where(inside_slab, np.inf, -np.inf), np.maximum(t_lower, t_upper)
+        )
+        t_enter = np.maximum(t_enter.max(axis=2), 0.0)
+        t_exit = np.minimum(t_exit.min(axis=2), 1.0)
+        in_collision[start : start + chunk_size] = np.any(t_enter <= t_exit, axis=1)
+    return in_collision
+
+
 def collision_check_spatial(environment_data_object, point):
     """
     Check if a point is in collision with the environment.
@@ -142,42 +279,66 @@ def collision_check_two_points(environment_data_object, point1, point2, SPACING=
         It then checks if any of the test points are in collision with the environment.
         The benefits of this function are that it is simple to implement and understand.
         The drawbacks are that it may be slow for large line segments or small spacing values.
+        When Numba is installed, the check is delegated to a compiled kernel that walks the test points without allocating them.
     """
-    delta = point2 - point1
+    if NUMBA_AVAILABLE:
+        return _collision_segment(
+            environment_data_object.lower_corners,
+            environment_data_object.upper_corners,
+            np.asarray(point1, dtype=np.float64),
+            np.asarray(point2, dtype=np.float64),
+            SPACING,
+        )
+
+    point1 = np.asarray(point1, dtype=np.float64)
+    delta = np.asarray(point2, dtype=np.float64) - point1
     distance = np.linalg.norm(delta)
+    if distance == 0.0:
+        # A segment of zero length is its start point
+        return bool(collision_check_batch(environment_data_object, point1[None, :])[0])
     direction = delta / distance
     number_of_points = int(distance / SPACING)
-    test_points = np.array(
-        [point1 + i * SPACING * direction for i in range(number_of_points + 1)]
-    )
-    segment_evaluation = np.array(
-        [
-            collision_check_vectorized(environment_data_object, test_point)
-            for test_point in test_points
-        ]
-    )
-    return np.any(segment_evaluation)
+    offsets = np.linspace(0.0, number_of_points * SPACING, number_of_points + 1)
+    test_points = point1[None, :] + offsets[:, None] * direction[None, :]
+    return bool(np.any(collision_check_batch(environment_data_object, test_points)))
+
+
+@functools.lru_cache(maxsize=16)
+def _utm_home(lon_h, lat_h):
+    """
+    Inputs: lon_h: float longitude of global home; lat_h: float latitude of global home
+    Returns: the (easting, northing, zone_number, zone_letter) UTM projection of global home. The projection is cached, since
+        every conversion relative to the same home location needs it.
+    """
+    return utm.from_latlon(lat_h, lon_h)
 
 
 def global_to_local(global_position, global_home):
     """
-    Inputs: global_position: numpy array [longitude, latitude, altitude]; global_home: numpy array: [longitude, latitude,
-        altitude]
+    Inputs: global_position: numpy array [longitude, latitude, altitude], or numpy array of shape (n, 3) holding one
+        [longitude, latitude, altitude] row per position; global_home: numpy array: [longitude, latitude, altitude]
     Returns: local_position numpy array [northing, easting, altitude] of global_position
         relative to global_home [longitude, latitude, altitude]; Essentially, returns a
-        numpy array describing the NED delta from global_home.
+        numpy array describing the NED delta from global_home. For an (n, 3) input, returns an (n, 3) array.
     """
     # Get easting and northing of global home first
     lonh, lath, alth = global_home[0], global_home[1], global_home[2]
-    (easting_h, northing_h, zone_number_h, zone_letter_h) = utm.from_latlon(lath, lonh)
+    (easting_h, northing_h, zone_number_h, zone_letter_h) = _utm_home(
+        float(lonh), float(lath)
+    )
 
-    # Get easting and northing from global position next
-    lon, lat, alt = global_position[0], global_position[1], global_position[2]
+    # Get easting and northing from global position next, projecting all rows at once for an (n, 3) input
+    global_position = np.asarray(global_position, dtype=np.float64)
+    lon, lat, alt = (
+        global_position[..., 0],
+        global_position[..., 1],
+        global_position[..., 2],
+    )
     (easting, northing, zone_number, zone_letter) = utm.from_latlon(lat, lon)
 
     # After that, create a local_position numpy array from its NED coordinates
-    local_position = np.array(
-        [northing - northing_h, easting - easting_h, (alt - alth)]
+    local_position = np.stack(
+        [northing - northing_h, easting - easting_h, (alt - alth)], axis=-1
     )
 
     # Finally, return them.
@@ -186,21 +347,23 @@ def global_to_local(global_position, global_home):
 
 def local_to_global(local_position, global_home):
     """
-    Inputs: local_position: numpy array [northing, easting, down]; global_home: numpy array [longitude, latitude, altitude]
+    Inputs: local_position: numpy array [northing, easting, down], or numpy array of shape (n, 3) holding one
+        [northing, easting, down] row per position; global_home: numpy array [longitude, latitude, altitude]
     Returns: global_position: numpy array [longitude, latitude, altitude]. Essentially, returns a numpy array holding a new
-        geodetic location given a home geodetic location and an NED delta.
+        geodetic location given a home geodetic location and an NED delta. For an (n, 3) input, returns an (n, 3) array.
     """
     # First, get global_home's easting, northing, zone_number, and grid_letter.
     lon_h, lat_h, alt_h = global_home[0], global_home[1], global_home[2]
-    (easting_h, northing_h, zone_number_h, zone_letter_h) = utm.from_latlon(
-        lat_h, lon_h
+    (easting_h, northing_h, zone_number_h, zone_letter_h) = _utm_home(
+        float(lon_h), float(lat_h)
     )
 
     # After that, compute the new NED location by adding local_position to home's NED coordinates.
+    local_position = np.asarray(local_position, dtype=np.float64)
     northing, easting, alt = (
-        local_position[0],
-        local_position[1],
-        local_position[2],
+        local_position[..., 0],
+        local_position[..., 1],
+        local_position[..., 2],
     )
 
     # Convert the new NED location to the geodetic frame next.
@@ -211,7 +374,7 @@ def local_to_global(local_position, global_home):
         zone_letter_h,
     )
     altitude = -(alt - alt_h)
-    global_position = np.array([longitude, latitude, altitude])
+    global_position = np.stack([longitude, latitude, altitude], axis=-1)
 
     # Finally, return the new geodetic location.
     return global_position
@@ -228,11 +391,17 @@ def euclidean_distance(lattice_object, lattice_index_1, lattice_index_2):
 
     Returns:
             float: the Euclidean distance between the two points
+
+    Note:
+            The distance is computed on Python floats, which is much faster than calling `np.linalg.norm` on a vector of
+            three elements, as this function is called once per heuristic evaluation.
     """
-    return np.linalg.norm(
-        lattice_object.free_space_points[lattice_index_1]
-        - lattice_object.free_space_points[lattice_index_2]
-    )
+    x1, y1, z1 = lattice_object.free_space_points[lattice_index_1].tolist()
+    x2, y2, z2 = lattice_object.free_space_points[lattice_index_2].tolist()
+    dx = x1 - x2
+    dy = y1 - y2
+    dz = z1 - z2
+    return math.sqrt(dx * dx + dy * dy + dz * dz)
 
 
 def find_nearest(free_space_lattice_object, query_pos):
@@ -241,15 +410,23 @@ def find_nearest(free_space_lattice_object, query_pos):
 
     Args:
             free_space_lattice_object (Lattice object): an object of the CubicLattice class
-            query_pos (numpy.ndarray): a numpy array of shape (3,) containing the query position
+            query_pos (numpy.ndarray): a numpy array of shape (3,) containing the query position, or of shape (n, 3)
+                containing a batch of query positions
 
     Returns:
-            int: the index of the nearest point in the free space lattice
+            int or numpy.ndarray: the index of the nearest point in the free space lattice, or an array of shape (n,)
+                containing the index of the nearest point for each query position of a batch
     """
+    query_pos = np.asarray(query_pos)
+    if query_pos.ndim == 1:
+        _, indices = free_space_lattice_object.free_space_points_kd_tree.query(
+            [query_pos], k=1
+        )
+        return indices[0]
     _, indices = free_space_lattice_object.free_space_points_kd_tree.query(
-        [query_pos], k=1
+        query_pos, k=1, workers=-1
     )
-    return indices[0]
+    return indices
 
 
 def shortcut(environment_data_object, input_path, points):
@@ -317,11 +494,68 @@ def valid_neighbors(free_space_lattice_object, current_index):
            current_index (int): the index of the current point in the free space lattice
 
     Returns:
-            list: a list of tuples containing the neighbor index and the distance to the neighbor
+            tuple: a numpy array containing the neighbor indices and a numpy array containing the distances to the neighbors
+
+    Note:
+            Both arrays are slices of the CSR arrays of the lattice, so no per-neighbor objects are created.
     """
+    start = free_space_lattice_object.indptr[current_index]
+    end = free_space_lattice_object.indptr[current_index + 1]
+    return (
+        free_space_lattice_object.indices[start:end],
+        free_space_lattice_object.weights[start:end],
+    )
 
-    neighbors = free_space_lattice_object.graph[current_index]
-    neighbor_pairs = [
-        (neighbor_index, distance) for neighbor_index, distance in neighbors.items()
-    ]
-    return neighbor_pairs
+
+def reconstruct_path(parent, start_index, end_index):
+    """
+    Reconstruct the path from the start index to the end index by following a parent array backward from the end index.
+
+    Args:
+            parent (numpy.ndarray): a numpy array of shape (n,) containing the parent of each reached point
+            start_index (int): the index of the first point of the path
+            end_index (int): the index of the last point of the path
+
+    Returns:
+            list: a list of indices representing the path from the start index to the end index
+
+    Note:
+            The indices are written into a preallocated int32 buffer in a single backward sweep, which is then reversed, so
+            no intermediate list is grown and reversed.
+    """
+    path = np.empty(len(parent), dtype=np.int32)
+    k = 0
+    current_index = end_index
+    while current_index != start_index:
+        path[k] = current_index
+        k += 1
+        current_index = parent[current_index]
+    path[k] = start_index
+    return path[k::-1].tolist()
+
+
+def edges_to_csr(number_of_nodes, sources, targets, weights):
+    """
+    Convert a list of weighted, directed edges into a compressed sparse row (CSR) graph.
+
+    Args:
+            number_of_nodes (int): the number of nodes of the graph
+            sources (numpy.ndarray): a numpy array of shape (E,) containing the source node of each edge
+            targets (numpy.ndarray): a numpy array of shape (E,) containing the target node of each edge
+            weights (numpy.ndarray): a numpy array of shape (E,) containing the weight of each edge
+
+    Returns:
+            tuple: the arrays (indptr, indices, weights), where the targets and weights of the edges leaving node i are
+                indices[indptr[i]:indptr[i + 1]] and weights[indptr[i]:indptr[i + 1]]
+
+    Note:
+            The offsets and indices are stored as int32 and the weights as float32, which halves the memory traffic of
+            the searches that walk the graph. The searches accumulate path costs in float64.
+    """
+    sources = np.asarray(sources, dtype=np.int32)
+    targets = np.asarray(targets, dtype=np.int32)
+    weights = np.asarray(weights, dtype=np.float32)
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(number_of_nodes + 1, dtype=np.int32)
+    np.cumsum(np.bincount(sources, minlength=number_of_nodes), out=indptr[1:])
+    return indptr, targets[order], weights[order]
@@ -0,0 +1,266 @@
+"""
+This module is an implementation of Numba-compiled kernels for the collision checks and graph search used by other modules
+of the package.
+
+Note:
+    Numba is an optional dependency. When it is not installed, `NUMBA_AVAILABLE` is False, the kernels stay plain Python
+    functions, and the functions of the other modules fall back to their NumPy and pure Python implementations instead of
+    calling them.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """
+        Stand-in for `numba.njit` that returns the decorated function unchanged.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
+
+
+@njit(cache=True, fastmath=True)
+def _collision_point(lower_corners, upper_corners, point):
+    """
+    Check if a point is in collision with any of a set of obstacles.
+
+    Args:
+        lower_corners (numpy.ndarray): a numpy array of shape (m, 3) containing the lower corners of the obstacles
+        upper_corners (numpy.ndarray): a numpy array of shape (m, 3) containing the upper corners of the obstacles
+        point (numpy.ndarray): a numpy array of shape (3,) containing the point to check
+
+    Returns:
+        bool: a boolean indicating whether the point is in collision with any of the obstacles
+    """
+    for idx in range(lower_corners.shape[0]):
+        if (
+            lower_corners[idx, 0] <= point[0] <= upper_corners[idx, 0]
+            and lower_corners[idx, 1] <= point[1] <= upper_corners[idx, 1]
+            and lower_corners[idx, 2] <= point[2] <= upper_corners[idx, 2]
+        ):
+            return True
+    return False
+
+
+@njit(cache=True, fastmath=True)
+def _collision_segment(lower_corners, upper_corners, point1, point2, spacing):
+    """
+    Check if the line segment between two points is in collision with any of a set of obstacles.
+
+    Args:
+        lower_corners (numpy.ndarray): a numpy array of shape (m, 3) containing the lower corners of the obstacles
+        upper_corners (numpy.ndarray): a numpy array of shape (m, 3) containing the upper corners of the obstacles
+        point1 (numpy.ndarray): a numpy array of shape (3,) containing the start point of the line segment
+        point2 (numpy.ndarray): a numpy array of shape (3,) containing the end point of the line segment
+        spacing (float): the spacing between test points on the line segment
+
+    Returns:
+        bool: a boolean indicating whether the line segment is in collision with any of the obstacles
+
+    Note:
+        The test points are generated one at a time while walking the segment, so no array of test points is allocated.
+    """
+    dx = point2[0] - point1[0]
+    dy = point2[1] - point1[1]
+    dz = point2[2] - point1[2]
+    distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+    number_of_points = 0
+    if distance > 0.0:
+        number_of_points = int(distance / spacing)
+        dx /= distance
+        dy /= distance
+        dz /= distance
+    for i in range(number_of_points + 1):
+        x = point1[0] + i * spacing * dx
+        y = point1[1] + i * spacing * dy
+        z = point1[2] + i * spacing * dz
+        for idx in range(lower_corners.shape[0]):
+            if (
+                lower_corners[idx, 0] <= x <= upper_corners[idx, 0]
+                and lower_corners[idx, 1] <= y <= upper_corners[idx, 1]
+                and lower_corners[idx, 2] <= z <= upper_corners[idx, 2]
+            ):
+                return True
+    return False
+
+
+def build_collision_kernel(lower_corners, upper_corners):
+    """
+    Build a point collision check specialized on a fixed set of obstacles.
+
+    Args:
+        lower_corners (numpy.ndarray): a numpy array of shape (m, 3) containing the lower corners of the obstacles
+        upper_corners (numpy.ndarray): a numpy array of shape (m, 3) containing the upper corners of the obstacles
+
+    Returns:
+        function: a function `point_in_collision(point)` that returns a boolean indicating whether a point of shape (3,)
+            is in collision with any of the obstacles
+
+    Note:
+        With Numba, the obstacle corners and their count are captured by the closure, so they are compiled into the kernel
+        as constants instead of being passed in on every call. A closure over arrays cannot be cached to disk, so the kernel
+        is compiled on its first call in every process, which takes about a quarter of a second against roughly 1.5 us
+        saved per check compared with `_collision_point`. It is therefore an explicit opt-in for callers that run on the
+        order of 100,000 checks or more against one environment; `collision_check_vectorized` keeps using the cached
+        `_collision_point`.
+        Without Numba, the returned function tests the point against all obstacles with NumPy.
+    """
+    lower_corners = np.ascontiguousarray(lower_corners, dtype=np.float64).copy()
+    upper_corners = np.ascontiguousarray(upper_corners, dtype=np.float64).copy()
+    number_of_obstacles = lower_corners.shape[0]
+
+    if not NUMBA_AVAILABLE:
+
+        def point_in_collision(point):
+            collision_conditions = (point >= lower_corners) & (point <= upper_corners)
+            return bool(np.any(np.all(collision_conditions, axis=1)))
+
+        return point_in_collision
+
+    @njit(fastmath=True)
+    def point_in_collision(point):
+        for idx in range(number_of_obstacles):
+            if (
+                lower_corners[idx, 0] <= point[0] <= upper_corners[idx, 0]
+                and lower_corners[idx, 1] <= point[1] <= upper_corners[idx, 1]
+                and lower_corners[idx, 2] <= point[2] <= upper_corners[idx, 2]
+            ):
+                return True
+        return False
+
+    return point_in_collision
+
+
+@njit(cache=True)
+def _heap_less(heap_f, heap_g, heap_index, i, j):
+    """
+    Order heap entries by f-score, then by descending g-score, then by index, like the (f, -g, index) tuples used with
+    `heapq`.
+    """
+    if heap_f[i] != heap_f[j]:
+        return heap_f[i] < heap_f[j]
+    if heap_g[i] != heap_g[j]:
+        return heap_g[i] > heap_g[j]
+    return heap_index[i] < heap_index[j]
+
+
+@njit(cache=True)
+def _heap_swap(heap_f, heap_g, heap_index, i, j):
+    """
+    Swap two entries of a binary heap stored in three arrays.
+    """
+    heap_f[i], heap_f[j] = heap_f[j], heap_f[i]
+    heap_g[i], heap_g[j] = heap_g[j], heap_g[i]
+    heap_index[i], heap_index[j] = heap_index[j], heap_index[i]
+
+
+@njit(cache=True)
+def _heap_push(heap_f, heap_g, heap_index, size, f, g, index):
+    """
+    Push an entry onto a binary min-heap stored in three arrays and return the new size of the heap.
+    """
+    i = size
+    heap_f[i] = f
+    heap_g[i] = g
+    heap_index[i] = index
+    while i > 0:
+        parent = (i - 1) // 2
+        if not _heap_less(heap_f, heap_g, heap_index, i, parent):
+            break
+        _heap_swap(heap_f, heap_g, heap_index, i, parent)
+        i = parent
+    return size + 1
+
+
+@njit(cache=True)
+def _heap_pop(heap_f, heap_g, heap_index, size):
+    """
+    Pop the smallest entry off a binary min-heap stored in three arrays and return its index with the new size of the
+    heap.
+    """
+    index = heap_index[0]
+    size -= 1
+    heap_f[0] = heap_f[size]
+    heap_g[0] = heap_g[size]
+    heap_index[0] = heap_index[size]
+    i = 0
+    while True:
+        smallest = i
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < size and _heap_less(heap_f, heap_g, heap_index, child, smallest):
+                smallest = child
+        if smallest == i:
+            break
+        _heap_swap(heap_f, heap_g, heap_index, i, smallest)
+        i = smallest
+    return index, size
+
+
+@njit(cache=True)
+def _astar_core(indptr, indices, weights, coords, start, goal):
+    """
+    Perform A* search with a Euclidean heuristic on a graph stored in compressed sparse row (CSR) form.
+
+    Args:
+        indptr (numpy.ndarray): a numpy array of shape (n + 1,) containing the offsets of each node's neighbors
+        indices (numpy.ndarray): a numpy array of shape (E,) containing the neighbor indices
+        weights (numpy.ndarray): a numpy array of shape (E,) containing the edge lengths
+        coords (numpy.ndarray): a numpy array of shape (n, 3) containing the coordinates of the nodes, in float32 or float64
+        start (int): the index of the start node
+        goal (int): the index of the goal node
+
+    Returns:
+        tuple: a numpy array of shape (n,) containing the parent of each reached node (-1 otherwise) and a boolean
+            indicating whether the goal was found
+
+    Note:
+        The open list is a binary heap held in three preallocated arrays, ordered like the open list of `astar`. Every push follows the relaxation of an edge
+        leaving a node that is expanded once, so the heap never holds more than E + 1 entries.
+        The coordinates and weights may be stored in float32, but the heuristic and the g-scores are computed in float64.
+    """
+    number_of_nodes = indptr.shape[0] - 1
+    parent = np.full(number_of_nodes, -1, dtype=np.int32)
+    g_scores = np.full(number_of_nodes, np.inf)
+    closed = np.zeros(number_of_nodes, dtype=np.bool_)
+    heap_f = np.empty(indices.shape[0] + 1, dtype=np.float64)
+    heap_g = np.empty(indices.shape[0] + 1, dtype=np.float64)
+    heap_index = np.empty(indices.shape[0] + 1, dtype=np.int64)
+
+    gx = np.float64(coords[goal, 0])
+    gy = np.float64(coords[goal, 1])
+    gz = np.float64(coords[goal, 2])
+
+    g_scores[start] = 0.0
+    size = _heap_push(heap_f, heap_g, heap_index, 0, 0.0, 0.0, start)
+    while size > 0:
+        current, size = _heap_pop(heap_f, heap_g, heap_index, size)
+        if closed[current]:
+            continue
+        closed[current] = True
+        if current == goal:
+            return parent, True
+        for k in range(indptr[current], indptr[current + 1]):
+            neighbor = indices[k]
+            if closed[neighbor]:
+                continue
+            g_score_tentative = g_scores[current] + np.float64(weights[k])
+            if g_score_tentative <= g_scores[neighbor]:
+                dx = np.float64(coords[neighbor, 0]) - gx
+                dy = np.float64(coords[neighbor, 1]) - gy
+                dz = np.float64(coords[neighbor, 2]) - gz
+                f_score_tentative = g_score_tentative + math.sqrt(dx * dx + dy * dy + dz * dz)
+                size = _heap_push(
+                    heap_f, heap_g, heap_index, size, f_score_tentative, g_score_tentative, neighbor
+                )
+                parent[neighbor] = current
+                g_scores[neighbor] = g_score_tentative
+    return parent, False
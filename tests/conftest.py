@@ -1,23 +1,21 @@
-import json
-
 import numpy as np
 import pytest
 
 from planning_algorithms.environment_data import EnvironmentData
 from planning_algorithms.lattice import CubicLattice
+from planning_algorithms.main import load_config
 
 
 @pytest.fixture(scope="session")
 def config():
-    with open("config.json", "r") as f:
-        return json.load(f)
+    return load_config("config.json")
     
-@pytest.fixture
+@pytest.fixture(scope="session")
 def env_data(config):
     env_config = config["environment"]
     return EnvironmentData(env_config["obstacle_file"], env_config["margin_of_safety"])
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def lattice(env_data):
     return CubicLattice(
         env_data,
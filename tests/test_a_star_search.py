@@ -2,6 +2,7 @@ import numpy as np
 import pytest
 
 from planning_algorithms.a_star_search import astar
+from planning_algorithms.hda_star_search import hda_star
 from planning_algorithms.utils import euclidean_distance
 
 def test_astar_finds_path(env_data, lattice):
@@ -14,4 +15,47 @@ def test_astar_finds_path(env_data, lattice):
         lattice, start_gps_np, goal_gps_np, euclidean_distance
     )
     assert len(optimal_path) > 1
-    
\ No newline at end of file
+    
+def path_length(lattice, path):
+    points = lattice.free_space_points[path]
+    return np.sum(np.linalg.norm(np.diff(points, axis=0), axis=1))
+
+def test_astar_compiled_and_python_searches_agree(env_data, lattice):
+    """
+    Tests that the search with the built-in Euclidean heuristic finds a path as short as the search with a custom heuristic.
+    """
+    start_gps_np = np.array([-122.397450, 37.792480, 0.0])
+    goal_gps_np = np.array([-122.397230, 37.792895, 50.0])
+    builtin_path = astar(lattice, start_gps_np, goal_gps_np, euclidean_distance)
+    custom_path = astar(
+        lattice, start_gps_np, goal_gps_np, lambda *args: euclidean_distance(*args)
+    )
+    assert builtin_path[0] == custom_path[0] and builtin_path[-1] == custom_path[-1]
+    assert path_length(lattice, builtin_path) == pytest.approx(path_length(lattice, custom_path))
+
+def test_hda_star_finds_optimal_path(env_data, lattice):
+    """
+    Tests that the parallel HDA* search finds a path as short as the serial A* search.
+    """
+    start_gps_np = np.array([-122.397450, 37.792480, 0.0])
+    goal_gps_np = np.array([-122.397230, 37.792895, 50.0])
+    serial_path = astar(lattice, start_gps_np, goal_gps_np, euclidean_distance)
+    parallel_path = hda_star(lattice, start_gps_np, goal_gps_np, workers=2)
+    assert parallel_path[0] == serial_path[0] and parallel_path[-1] == serial_path[-1]
+    assert path_length(lattice, parallel_path) == pytest.approx(path_length(lattice, serial_path))
+
+def test_bidirectional_astar_finds_optimal_path(env_data, lattice):
+    """
+    Tests that the bidirectional search finds a path between the same points as short as the unidirectional search.
+    """
+    start_gps_np = np.array([-122.397450, 37.792480, 0.0])
+    goal_gps_np = np.array([-122.397230, 37.792895, 50.0])
+    unidirectional_path = astar(lattice, start_gps_np, goal_gps_np, euclidean_distance)
+    bidirectional_path = astar(
+        lattice, start_gps_np, goal_gps_np, euclidean_distance, bidirectional=True
+    )
+    assert bidirectional_path[0] == unidirectional_path[0]
+    assert bidirectional_path[-1] == unidirectional_path[-1]
+    assert path_length(lattice, bidirectional_path) == pytest.approx(
+        path_length(lattice, unidirectional_path)
+    )
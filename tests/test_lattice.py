@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from planning_algorithms.lattice import CubicLattice
+from planning_algorithms.utils import collision_check_batch, valid_neighbors
+
+def test_lattice_points_are_free(env_data, lattice):
+    """
+    Tests that none of the lattice points are in collision with the environment.
+    """
+    assert not np.any(collision_check_batch(env_data, lattice.free_space_points))
+
+def test_lattice_graph_is_symmetric(lattice):
+    """
+    Tests that every edge of the lattice graph is stored in both directions with the length of the edge as its weight.
+    """
+    assert len(lattice.indptr) == len(lattice.free_space_points) + 1
+    assert lattice.indptr[-1] == len(lattice.indices) == len(lattice.weights)
+    for i in range(len(lattice.free_space_points)):
+        neighbor_indices, distances = valid_neighbors(lattice, i)
+        for j, distance in zip(neighbor_indices, distances):
+            assert distance == pytest.approx(
+                np.linalg.norm(lattice.free_space_points[i] - lattice.free_space_points[j])
+            )
+            assert i in valid_neighbors(lattice, j)[0]
+
+def test_lattice_edges_do_not_intersect_obstacles(env_data):
+    """
+    Tests that no edge of the lattice graph passes through an obstacle, including diagonal edges that could clip the corner
+    of an obstacle between two free end points.
+    """
+    lattice = CubicLattice(
+        env_data,
+        center=np.array([0.0, 0.0, 20.0]),
+        halfsizes=np.array([60.0, 60.0, 20.0]),
+        resolution=10.0,
+        connectivity="full",
+    )
+    sources = np.repeat(np.arange(len(lattice.free_space_points)), np.diff(lattice.indptr))
+    points_i = lattice.free_space_points[sources].astype(float)[:, None, :]
+    points_j = lattice.free_space_points[lattice.indices].astype(float)[:, None, :]
+    t = np.linspace(0.0, 1.0, 500)[None, :, None]
+    for start in range(0, len(sources), 500):
+        samples = points_i[start : start + 500] * (1 - t) + points_j[start : start + 500] * t
+        assert not np.any(collision_check_batch(env_data, samples.reshape(-1, 3)))
@@ -0,0 +1,188 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from planning_algorithms.main import (
+    _coerce_config,
+    _run_step,
+    load_config,
+    main,
+    run_astar,
+    run_lattice,
+    run_obstacle_data,
+    run_prm,
+    run_trajectory,
+)
+
+@pytest.fixture
+def no_rendering(monkeypatch):
+    """
+    Makes creating or showing a matplotlib figure fail the test, so tests do not depend on the backend being headless.
+    """
+    def fail_on_render(*args, **kwargs):
+        raise AssertionError("a figure was rendered")
+
+    monkeypatch.setattr("matplotlib.pyplot.show", fail_on_render)
+    monkeypatch.setattr("matplotlib.pyplot.figure", fail_on_render)
+
+def test_run_astar_without_visualization(env_data, lattice, no_rendering):
+    """
+    Tests that the A* demonstration returns a path without rendering the lattice when visualization is disabled.
+    """
+    optimal_path = run_astar(
+        env_data,
+        lattice,
+        [-122.397450, 37.792480, 0.0],
+        [-122.397230, 37.792895, 50.0],
+        visualize=False,
+    )
+    assert len(optimal_path) > 1
+
+def test_run_prm_without_visualization(env_data, no_rendering):
+    """
+    Tests that the PRM demonstration returns a path without rendering the roadmap when visualization is disabled.
+    """
+    np.random.seed(0)
+    prm_path = run_prm(
+        env_data,
+        [-122.39745, 37.79248, 0],
+        [-122.39645, 37.79278, 200],
+        density=1e-5,
+        neighbors=5,
+        visualization_bounds=[-100, 100, -100, 100, 0, 200],
+        visualize=False,
+    )
+    assert len(prm_path) > 1
+
+def test_load_config_reuses_parse_until_file_changes(tmp_path):
+    """
+    Tests that loading an unchanged configuration file returns the cached configuration and that a modified file is parsed again.
+    """
+    config_path = tmp_path / "config.json"
+    config_path.write_text('{"visualize": false}')
+    config_data = load_config(config_path)
+    assert load_config(config_path) is config_data
+
+    config_path.write_text('{"visualize": true}')
+    os.utime(config_path, ns=(0, config_path.stat().st_mtime_ns + 1))
+    assert load_config(config_path) == {"visualize": True}
+
+def test_coerce_config_converts_coordinates_to_arrays():
+    """
+    Tests that the coordinate entries of a configuration are converted to float64 arrays and other entries are left alone.
+    """
+    config_data = _coerce_config(
+        {"lattice": {"center": [0, 0, 0], "resolution": 15.0}, "prm": None}
+    )
+    center = config_data["lattice"]["center"]
+    assert isinstance(center, np.ndarray) and center.dtype == np.float64
+    assert config_data["lattice"]["resolution"] == 15.0
+
+def test_obstacle_data_and_lattice_steps_reuse_cached_results(config, tmp_path):
+    """
+    Tests that running the obstacle data and lattice steps again with the same arguments returns the cached objects, and
+    that the obstacle data is read again once its file is modified.
+    """
+    env_config = config["environment"]
+    environment_data = run_obstacle_data(
+        env_config["obstacle_file"], env_config["margin_of_safety"], visualize=False
+    )
+    assert run_obstacle_data(
+        env_config["obstacle_file"], env_config["margin_of_safety"], visualize=False
+    ) is environment_data
+
+    modified_file = tmp_path / "colliders.csv"
+    modified_file.write_bytes(Path(env_config["obstacle_file"]).read_bytes())
+    stale_data = run_obstacle_data(modified_file, env_config["margin_of_safety"], visualize=False)
+    with open(modified_file, "a") as f:
+        f.write("\n0.0,0.0,500.0,1.0,1.0,1.0\n")
+    os.utime(modified_file, ns=(0, modified_file.stat().st_mtime_ns + 1))
+    fresh_data = run_obstacle_data(modified_file, env_config["margin_of_safety"], visualize=False)
+    assert fresh_data is not stale_data
+    assert len(fresh_data.centers) == len(stale_data.centers) + 1
+
+    lattice = run_lattice(environment_data, [0, 0, 10], [5, 5, 5], 2.0, "full", visualize=False)
+    assert run_lattice(environment_data, [0.0, 0.0, 10.0], [5, 5, 5], 2, "full", visualize=False) is lattice
+    assert run_lattice(environment_data, [0, 0, 10], [5, 5, 5], 2.0, "partial", visualize=False) is not lattice
+
+def test_run_step_retries_until_the_step_succeeds(monkeypatch):
+    """
+    Tests that a step is prompted again after invalid input or a failure and that its result is stored for later steps.
+    """
+    answers = iter(["x", "d", "d"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    attempts = []
+
+    def add(a, b, visualize):
+        attempts.append((a, b))
+        if len(attempts) == 1:
+            raise ValueError("first attempt fails")
+        return a + b
+
+    step = ("Add numbers", "add numbers", "numbers", add, lambda section, results: dict(a=section[0], b=section[1]), "sum")
+    results = {}
+    assert _run_step(2, step, {"numbers": [1, 2]}, results)
+    assert results == {"sum": 3}
+    assert len(attempts) == 2
+
+def test_run_trajectory_without_visualization(tmp_path, no_rendering):
+    """
+    Tests that the trajectory demonstration saves its data without plotting when visualization and plotting are disabled.
+    """
+    run_trajectory(
+        [[0, 0, 0], [20, 10, 10], [20, -20, 20], [30, 40, 10]],
+        5.0,
+        str(tmp_path),
+        visualize=False,
+        plot=False,
+    )
+    assert (tmp_path / "x_position.csv").exists()
+    assert not (tmp_path / "trajectory_profiles.png").exists()
+
+def test_run_trajectory_saves_profiles_in_one_figure(tmp_path):
+    """
+    Tests that the trajectory demonstration saves its data and a single profile figure to the output directory.
+    """
+    run_trajectory(
+        [[0, 0, 0], [20, 10, 10], [20, -20, 20], [30, 40, 10]],
+        5.0,
+        str(tmp_path),
+        visualize=False,
+        plot=True,
+    )
+    assert (tmp_path / "x_position.csv").exists()
+    assert (tmp_path / "trajectory_profiles.png").exists()
+
+def test_batch_mode_runs_every_step_without_rendering(tmp_path, monkeypatch, no_rendering):
+    """
+    Tests that the batch mode runs the pipeline to the end without rendering, even when the configuration enables it.
+    """
+    config_data = load_config("config.json")
+    tmp_config = {
+        "visualize": True,
+        "environment": {
+            "obstacle_file": str(Path(config_data["environment"]["obstacle_file"]).resolve()),
+            "margin_of_safety": config_data["environment"]["margin_of_safety"],
+        },
+        "lattice": {"center": [0, 0, 10], "halfsizes": [5, 5, 5], "resolution": 2.0, "connectivity": "full"},
+        "astar": {"start_gps": [-122.397450, 37.792480, 0.0], "goal_gps": [-122.397230, 37.792895, 50.0]},
+        "prm": {
+            "start_gps": [-122.39745, 37.79248, 0],
+            "goal_gps": [-122.39645, 37.79278, 200],
+            "density": 1e-6,
+            "neighbors": 5,
+            "visualization_bounds": [-100, 100, -100, 100, 0, 200],
+        },
+        "trajectory": {
+            "waypoints": [[0, 0, 0], [20, 10, 10], [20, -20, 20], [30, 40, 10]],
+            "average_speed": 5.0,
+            "output_directory": str(tmp_path),
+        },
+    }
+    (tmp_path / "config.json").write_text(json.dumps(tmp_config))
+    monkeypatch.chdir(tmp_path)
+    main(["--batch"])
+    assert (tmp_path / "x_position.csv").exists()
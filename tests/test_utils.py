@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from planning_algorithms.utils import (
+    collision_check_basic,
+    collision_check_batch,
+    collision_check_segments,
+    collision_check_two_points,
+    find_nearest,
+    collision_check_vectorized,
+    global_to_local,
+    local_to_global,
+)
+from planning_algorithms.prm import PRM
+from planning_algorithms.utils_numba import _collision_point, _collision_segment
+
+@pytest.mark.parametrize("numba_available", [True, False])
+def test_collision_check_batch_matches_vectorized(env_data, monkeypatch, numba_available):
+    """
+    Tests that the batched collision check agrees with the single-point vectorized collision check, both through the
+    collision kernel and through the NumPy path with scratch buffers.
+    """
+    monkeypatch.setattr("planning_algorithms.utils.NUMBA_AVAILABLE", numba_available)
+    rng = np.random.default_rng(0)
+    points = rng.uniform([-100, -100, 0], [100, 100, 200], size=(500, 3))
+    expected = np.array(
+        [collision_check_vectorized(env_data, point) for point in points]
+    )
+    assert np.array_equal(collision_check_batch(env_data, points, chunk_size=64), expected)
+
+def test_collision_check_basic_uses_all_three_axes(env_data):
+    """
+    Tests that the basic collision check compares each coordinate of the point with the matching coordinate of the obstacle.
+    """
+    center = env_data.centers[0]
+    halfsize = env_data.halfsizes[0]
+    above = center + np.array([0.0, 0.0, halfsize[2] + 1.0])
+    assert collision_check_basic(env_data, center)
+    assert collision_check_basic(env_data, above) == collision_check_vectorized(env_data, above)
+
+def test_collision_kernels_match_batch(env_data):
+    """
+    Tests that the collision kernels agree with the batched collision check for points and sampled segments.
+    """
+    rng = np.random.default_rng(1)
+    points = rng.uniform([-100, -100, 0], [100, 100, 200], size=(200, 3))
+    expected = collision_check_batch(env_data, points)
+    for point, in_collision in zip(points, expected):
+        assert _collision_point(env_data.lower_corners, env_data.upper_corners, point) == in_collision
+        assert env_data.collision_kernel(point) == in_collision
+
+    point1, point2 = points[0], points[1]
+    distance = np.linalg.norm(point2 - point1)
+    test_points = point1 + np.arange(int(distance) + 1)[:, None] * (point2 - point1) / distance
+    assert _collision_segment(
+        env_data.lower_corners, env_data.upper_corners, point1, point2, 1.0
+    ) == np.any(collision_check_batch(env_data, test_points))
+
+def test_collision_check_two_points_numpy_path_matches_kernel(env_data, monkeypatch):
+    """
+    Tests that the NumPy segment check agrees with the compiled segment kernel, including for segments of zero length.
+    """
+    monkeypatch.setattr("planning_algorithms.utils.NUMBA_AVAILABLE", False)
+    rng = np.random.default_rng(2)
+    points = rng.uniform([-100, -100, 0], [100, 100, 200], size=(40, 3))
+    inside = env_data.centers[0]
+    segments = list(zip(points[::2], points[1::2])) + [(inside, inside), (points[0], points[0])]
+    for point1, point2 in segments:
+        assert collision_check_two_points(env_data, point1, point2) == _collision_segment(
+            env_data.lower_corners, env_data.upper_corners, point1, point2, 1.0
+        )
+    assert collision_check_two_points(env_data, inside, inside)
+
+def test_collision_check_segments_is_exact(env_data):
+    """
+    Tests that the segment check finds segments through an obstacle, segments that only clip its corner, and segments of
+    zero length inside it, and accepts segments that pass next to it.
+    """
+    lower = env_data.lower_corners[0]
+    upper = env_data.upper_corners[0]
+    center = env_data.centers[0]
+    points1 = np.array([
+        center - [50.0, 0.0, 0.0],  # through the middle
+        [lower[0] - 0.1, lower[1] + 0.15, center[2]],  # clips the corner over a few centimeters
+        center,  # zero length, inside
+        [lower[0] - 0.1, lower[1] - 10.0, center[2]],  # parallel to a face, just outside
+    ])
+    points2 = np.array([
+        center + [50.0, 0.0, 0.0],
+        [lower[0] + 0.15, lower[1] - 0.1, center[2]],
+        center,
+        [lower[0] - 0.1, upper[1] + 10.0, center[2]],
+    ])
+    in_collision = collision_check_segments(env_data, points1, points2, chunk_size=2)
+    assert in_collision.tolist()[:3] == [True, True, True]
+    assert in_collision[3] == np.any(
+        collision_check_batch(env_data, np.linspace(points1[3], points2[3], 2000))
+    )
+
+def test_find_nearest_batch_matches_single_queries(env_data, lattice):
+    """
+    Tests that a batch of nearest point queries gives the same indices as querying each position on its own, for the cKDTree
+    of a lattice and the KDTree of a PRM.
+    """
+    np.random.seed(0)
+    roadmap = PRM(env_data, DENSITY=1e-6, NEIGHBORS=5)
+    rng = np.random.default_rng(3)
+    for graph, lower, upper in (
+        (lattice, lattice.lower_bounds, lattice.upper_bounds),
+        (roadmap, [-100, -100, 0], [100, 100, 200]),
+    ):
+        query_positions = rng.uniform(lower, upper, size=(50, 3))
+        expected = [find_nearest(graph, query_pos) for query_pos in query_positions]
+        assert np.array_equal(find_nearest(graph, query_positions), expected)
+
+def test_global_local_conversions_accept_batches(env_data):
+    """
+    Tests that converting a batch of positions gives the same result as converting each position on its own.
+    """
+    local_positions = np.array([[0.0, 0.0, -10.0], [120.0, -45.0, -30.0], [-80.0, 60.0, 0.0]])
+    global_positions = local_to_global(local_positions, env_data.gps_home)
+    for local_position, global_position in zip(local_positions, global_positions):
+        assert np.allclose(local_to_global(local_position, env_data.gps_home), global_position)
+    assert np.allclose(
+        global_to_local(global_positions, env_data.gps_home)[:, :2],
+        local_positions[:, :2],
+        atol=1e-3,
+    )